@@ -2,6 +2,7 @@ package org.example;
 
 import java.io.BufferedReader;
 import java.io.File;
+import java.io.IOException;
 import java.io.InputStreamReader;
 
 public class MainWorkflow {
@@ -21,11 +22,38 @@ public class MainWorkflow {
     static final String SCRIPT_PYTHON = "pipeline_rca.py";
     static final String PLAN_JSON     = RESOURCES_PATH + File.separator + "plan_amelioration.json"; // Output du python
     static final String PYTHON_CMD    = "python3"; // ou "python" selon ton système
+    static final long WORKER_TIMEOUT_MS = 30 * 60 * 1000; // Délai max d'une analyse par le worker
 
     public static void main(String[] args) {
         long start = System.currentTimeMillis();
 
-        String inputFileName = (args.length > 0) ? args[0] : "transport.ecore";
+        // Plusieurs modèles possibles : MainWorkflow a.ecore b.ecore ...
+        String[] inputs = (args.length > 0) ? args : new String[]{ "transport.ecore" };
+
+        System.out.println("=== PIPELINE IDM-RCA-LLM ===");
+
+        // Un seul worker Python pour tous les modèles (caches et bibliothèques restent chargés)
+        RcaRunner runner = startPythonWorker();
+        try {
+            for (String inputFileName : inputs) {
+                if (inputs.length > 1) System.out.println("\n=== MODÈLE : " + inputFileName + " ===");
+                // Worker mort (plantage, délai dépassé) : on en relance un pour les modèles suivants
+                if (runner != null && !runner.isAlive()) {
+                    System.err.println("   -> Worker Python arrêté : redémarrage.");
+                    runner.close();
+                    runner = startPythonWorker();
+                }
+                processModel(inputFileName, runner);
+            }
+        } finally {
+            if (runner != null) runner.close();
+        }
+
+        System.out.println("\n=== FIN DU TRAITEMENT (" + (System.currentTimeMillis() - start) + "ms) ===");
+        System.exit(0);
+    }
+
+    private static void processModel(String inputFileName, RcaRunner runner) {
         String fullInputPath = RESOURCES_PATH + File.separator + inputFileName;
 
         File oldJson = new File(PLAN_JSON);
@@ -34,15 +62,21 @@ public class MainWorkflow {
             System.out.println("[INFO] Ancien plan supprimé pour garantir une nouvelle analyse.");
         }
 
-        System.out.println("=== PIPELINE IDM-RCA-LLM ===");
-
         // 1. Extraction (JAVA)
         // Génère le fichier .rcft avec Contextes + Relations
         ModelExtractor.runExtraction(fullInputPath, FILE_RCFT);
 
         // 2. Analyse (PYTHON)
-        // Lit le .rcft -> Boucle RCA -> Gemini -> JSON
-        runPythonScript();
+        // Lit le .rcft -> Boucle RCA -> Mistral -> JSON
+        boolean analyzed = false;
+        if (runner != null && runner.isAlive()) {
+            System.out.println("\n[SYSTEM] Analyse par le worker Python (" + SCRIPT_PYTHON + " --worker)...");
+            analyzed = runner.analyze(FILE_RCFT, PLAN_JSON);
+            if (!analyzed) System.err.println("   -> Échec du worker : analyse relancée dans un processus Python séparé.");
+        }
+        if (!analyzed) {
+            runPythonScript();
+        }
 
         // 3. Refactoring (JAVA)
         // Lit le JSON -> Modifie le Ecore
@@ -53,9 +87,18 @@ public class MainWorkflow {
         } else {
             System.err.println("\n[ERREUR] Le script Python n'a pas généré de plan JSON.");
         }
+    }
 
-        System.out.println("\n=== FIN DU TRAITEMENT (" + (System.currentTimeMillis() - start) + "ms) ===");
-        System.exit(0);
+    private static RcaRunner startPythonWorker() {
+        try {
+            RcaRunner runner = new RcaRunner(PYTHON_CMD, SCRIPT_PYTHON, new File(RESOURCES_PATH), WORKER_TIMEOUT_MS);
+            if (runner.ping()) return runner;
+            runner.close();
+        } catch (IOException e) {
+            System.err.println("   -> " + e.getMessage());
+        }
+        System.err.println("   -> Worker Python indisponible : lancement d'un processus par modèle.");
+        return null;
     }
 
     private static void runPythonScript() {
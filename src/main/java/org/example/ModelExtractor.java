@@ -77,6 +77,8 @@ public class ModelExtractor {
                 writer.write("source Classes\n");
                 writer.write("target Types\n");
                 writer.write("scaling exist\n");
+                // Relation très creuse : on ne liste que les types utilisés par chaque classe
+                writer.write("format sparse\n");
 
                 // En-tête de la matrice relationnelle
                 writer.write("| |");
@@ -84,13 +86,13 @@ public class ModelExtractor {
                 for (String t : typesList) writer.write(" " + t + " |");
                 writer.write("\n");
 
-                // Remplissage de la matrice
+                // Remplissage (dialecte creux) : | Classe | Type1 Type2 |
                 for (EClass c : classes) {
                     writer.write("| " + c.getName() + " |");
                     for (String t : typesList) {
-                        writer.write(usesType(c, t) ? " x |" : " |");
+                        if (usesType(c, t)) writer.write(" " + t);
                     }
-                    writer.write("\n");
+                    writer.write(" |\n");
                 }
 
             }
@@ -1,4 +1,143 @@
 package org.example;
 
-public class RcaRunner {
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.nio.charset.StandardCharsets;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
+
+/**
+ * Client du worker Python (pipeline_rca.py --worker).
+ * Le processus Python est lancé une seule fois : interpréteur, bibliothèques,
+ * cache LLM et résultats RCA restent chauds d'un modèle à l'autre.
+ * Protocole : une requête JSON par ligne sur stdin, une réponse JSON par ligne sur stdout,
+ * les journaux Python arrivent sur stderr (recopiés avec le préfixe [PY]).
+ * Un worker qui ne répond pas dans le délai imparti est arrêté : l'appelant voit un échec
+ * (isAlive() devient faux) et peut basculer sur un processus Python par modèle.
+ */
+public class RcaRunner implements AutoCloseable {
+
+    private final Process process;
+    private final BufferedWriter requests;
+    private final BufferedReader responses;
+    private final long timeoutMillis;
+    private final ExecutorService reader = Executors.newSingleThreadExecutor(r -> {
+        Thread t = new Thread(r, "rca-worker-reader");
+        t.setDaemon(true);
+        return t;
+    });
+    private int nextId = 1;
+
+    /** timeoutMillis : durée max d'attente d'une réponse (une analyse complète, appels LLM compris). */
+    public RcaRunner(String pythonCmd, String script, File workDir, long timeoutMillis) throws IOException {
+        this.timeoutMillis = timeoutMillis;
+        ProcessBuilder pb = new ProcessBuilder(pythonCmd, script, "--worker");
+        pb.directory(workDir);
+        process = pb.start();
+        requests = new BufferedWriter(new OutputStreamWriter(process.getOutputStream(), StandardCharsets.UTF_8));
+        responses = new BufferedReader(new InputStreamReader(process.getInputStream(), StandardCharsets.UTF_8));
+
+        // Journaux du worker (stderr) recopiés en continu
+        Thread logs = new Thread(() -> {
+            try (BufferedReader err = new BufferedReader(new InputStreamReader(process.getErrorStream(), StandardCharsets.UTF_8))) {
+                String line;
+                while ((line = err.readLine()) != null) {
+                    System.out.println("   [PY] " + line);
+                }
+            } catch (IOException ignored) {
+                // Flux fermé à l'arrêt du worker
+            }
+        });
+        logs.setDaemon(true);
+        logs.start();
+    }
+
+    /** Analyse un fichier RCFT et écrit le plan JSON ; retourne true si le worker a réussi. */
+    public synchronized boolean analyze(String rcftPath, String outputJson) {
+        String response = send("\"cmd\": \"analyze\", \"rcft\": " + quote(rcftPath) + ", \"output\": " + quote(outputJson));
+        if (response == null) return false;
+        if (!response.contains("\"ok\": true")) {
+            System.err.println("   [PY] Échec de l'analyse : " + response);
+            return false;
+        }
+        return true;
+    }
+
+    /** Le processus worker tourne-t-il encore ? */
+    public boolean isAlive() {
+        return process.isAlive();
+    }
+
+    /** Vérifie que le worker répond. */
+    public synchronized boolean ping() {
+        String response = send("\"cmd\": \"ping\"");
+        return response != null && response.contains("\"ok\": true");
+    }
+
+    @Override
+    public synchronized void close() {
+        if (process.isAlive()) {
+            send("\"cmd\": \"shutdown\"");
+            try {
+                process.waitFor();
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                process.destroy();
+            }
+        }
+        reader.shutdownNow();
+    }
+
+    /** Envoie une requête (champs JSON sans accolades) et attend la ligne de réponse. */
+    private String send(String fields) {
+        if (!process.isAlive()) {
+            System.err.println("   [PY] Le worker est arrêté (code " + process.exitValue() + ").");
+            return null;
+        }
+        Future<String> pending = null;
+        try {
+            requests.write("{\"id\": " + (nextId++) + ", " + fields + "}\n");
+            requests.flush();
+            pending = reader.submit(responses::readLine);
+            String line = pending.get(timeoutMillis, TimeUnit.MILLISECONDS);
+            if (line == null) System.err.println("   [PY] Le worker s'est arrêté (code " + process.waitFor() + ").");
+            return line;
+        } catch (TimeoutException e) {
+            System.err.println("   [PY] Pas de réponse du worker après " + (timeoutMillis / 1000) + "s : arrêt du processus.");
+            pending.cancel(true);
+            process.destroyForcibly();
+            return null;
+        } catch (IOException | ExecutionException e) {
+            System.err.println("   -> Worker Python injoignable : " + e.getMessage());
+            return null;
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            return null;
+        }
+    }
+
+    private static String quote(String value) {
+        StringBuilder sb = new StringBuilder("\"");
+        for (char c : value.toCharArray()) {
+            switch (c) {
+                case '"': sb.append("\\\""); break;
+                case '\\': sb.append("\\\\"); break;
+                case '\n': sb.append("\\n"); break;
+                case '\r': sb.append("\\r"); break;
+                case '\t': sb.append("\\t"); break;
+                default:
+                    if (c < 0x20) sb.append(String.format("\\u%04x", (int) c));
+                    else sb.append(c);
+            }
+        }
+        return sb.append('"').toString();
+    }
 }
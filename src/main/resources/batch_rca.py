@@ -0,0 +1,175 @@
+"""
+Analyse par lots : pipeline RCA + IA sur de nombreux fichiers RCFT, dans un pool de processus.
+
+Entrée : un dossier (tous ses *.rcft) ou un manifeste texte, une ligne par modèle :
+    chemin/modele.rcft [chemin/plan.json]     # lignes vides et commentaires '#' ignorés
+(chemins relatifs au dossier du manifeste). Pour chaque modèle, dans le dossier de sortie :
+<nom>.plan.json (plan), <nom>.ignores.json (groupes écartés, s'il y en a), <nom>.log (journal du pipeline)
+et, si RCA_METRICS est défini, <nom>.metrics.json (ou .prom) : les métriques de ce seul modèle.
+
+Comme pour un appel direct du pipeline, le cache binaire (<modèle>.rcftb, RCFT_COMPILED=0 pour
+le désactiver) et le point de reprise (<modèle>.rcft.ckpt, RCA_CHECKPOINT=0) sont écrits à côté
+de chaque .rcft, dans le dossier d'entrée : c'est là que les exécutions suivantes les retrouvent.
+
+Les processus partagent le cache LLM (même fichier SQLite, en mode WAL) et un seul
+limiteur de débit (SharedTokenBucket) : LLM_RATE reste la limite globale du batch.
+Un résumé agrégé (débit, latences) est affiché et écrit dans batch_summary.json.
+
+Usage : python batch_rca.py modeles/ -o plans/ -j 4
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import time
+
+from metrics import get_metrics
+from mistral_client import SharedTokenBucket
+from pipeline_rca import LLM_BURST, LLM_RATE, run_rca_pipeline
+
+SUMMARY_JSON = 'batch_summary.json'
+
+_worker_limiter = None
+
+
+def _init_worker(limiter):
+    global _worker_limiter
+    _worker_limiter = limiter
+
+
+def read_manifest(path):
+    """Liste de (rcft, plan ou None) d'un manifeste texte"""
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line: continue
+            parts = line.split()
+            rcft = os.path.join(base, parts[0])
+            output = os.path.join(base, parts[1]) if len(parts) > 1 else None
+            jobs.append((rcft, output))
+    return jobs
+
+
+def collect_jobs(source, out_dir):
+    """Jobs (rcft, plan, ignorés, journal) depuis un dossier ou un manifeste"""
+    if os.path.isdir(source):
+        entries = [(os.path.join(source, name), None) for name in sorted(os.listdir(source)) if name.endswith(".rcft")]
+    else:
+        entries = read_manifest(source)
+
+    jobs = []
+    for rcft, output in entries:
+        stem = os.path.splitext(os.path.basename(rcft))[0]
+        output = output or os.path.join(out_dir, f"{stem}.plan.json")
+        base = os.path.splitext(output)[0]
+        if base.endswith(".plan"):
+            base = base[:-len(".plan")]
+        jobs.append((rcft, output, base + ".ignores.json", base + ".log"))
+    return jobs
+
+
+def _run_job(job):
+    """Pipeline complet d'un modèle (dans un worker), journal redirigé dans un fichier"""
+    rcft, output, skipped, log = job
+    start = time.perf_counter()
+    entry = {"rcft": rcft, "output": output, "log": log, "ok": False}
+    metrics_file = None
+    if os.getenv("RCA_METRICS"):
+        # Un fichier par modèle : le collecteur du worker est remis à zéro entre deux jobs
+        ext = ".prom" if os.getenv("RCA_METRICS").endswith((".prom", ".txt")) else ".json"
+        metrics_file = entry["metrics"] = os.path.splitext(log)[0] + ".metrics" + ext
+        get_metrics().reset()
+    try:
+        with open(log, 'w', encoding='utf-8') as f, contextlib.redirect_stdout(f):
+            result = run_rca_pipeline(rcft, output, skipped, limiter=_worker_limiter, metrics_file=metrics_file)
+        if result is None:
+            entry["error"] = "fichier illisible"
+        else:
+            entry.update(result, ok=True)
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = time.perf_counter() - start
+    return entry
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def summarize(entries, wall):
+    """Résumé agrégé du batch : volumes, débit, latences par modèle"""
+    done = [e for e in entries if e["ok"]]
+    latencies = [e["seconds"] for e in done]
+    groups = sum(e.get("groups", 0) for e in done)
+    return {
+        "models": len(entries),
+        "succeeded": len(done),
+        "failed": len(entries) - len(done),
+        "wall_seconds": wall,
+        "models_per_second": len(done) / wall if wall else 0.0,
+        "groups": groups,
+        "groups_per_second": groups / wall if wall else 0.0,
+        "improvements": sum(e.get("improvements", 0) for e in done),
+        "latency_seconds": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": _percentile(latencies, 0.5),
+            "p90": _percentile(latencies, 0.9),
+            "max": max(latencies, default=0.0),
+        },
+    }
+
+
+def run_batch(source, out_dir, processes=None, rate=LLM_RATE, burst=LLM_BURST):
+    """Lance le batch ; retourne le résumé (écrit aussi dans out_dir/batch_summary.json)"""
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = collect_jobs(source, out_dir)
+    processes = max(1, min(processes or os.cpu_count() or 1, len(jobs) or 1))
+    print(f"--- Batch : {len(jobs)} modèle(s), {processes} processus, {rate} req/s au total ---")
+
+    methods = multiprocessing.get_all_start_methods()
+    mp_ctx = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    limiter = SharedTokenBucket(rate, burst, mp_ctx)
+
+    entries = []
+    start = time.perf_counter()
+    with mp_ctx.Pool(processes, initializer=_init_worker, initargs=(limiter,)) as pool:
+        for entry in pool.imap_unordered(_run_job, jobs):
+            status = f"{entry.get('improvements', 0)} proposition(s)" if entry["ok"] else f"ÉCHEC ({entry['error']})"
+            print(f"   [{len(entries) + 1}/{len(jobs)}] {os.path.basename(entry['rcft'])} : {status}, {entry['seconds']:.2f}s")
+            entries.append(entry)
+    wall = time.perf_counter() - start
+
+    order = {job[0]: k for k, job in enumerate(jobs)}
+    entries.sort(key=lambda e: order[e["rcft"]])
+    summary = summarize(entries, wall)
+    summary["jobs"] = entries
+
+    path = os.path.join(out_dir, SUMMARY_JSON)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+    lat = summary["latency_seconds"]
+    print(f"\n[FIN] {summary['succeeded']}/{summary['models']} modèle(s) en {wall:.2f}s "
+          f"({summary['models_per_second']:.2f} modèles/s, {summary['groups_per_second']:.1f} groupes/s), "
+          f"latence p50 {lat['p50']:.2f}s / p90 {lat['p90']:.2f}s. Résumé : {path}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline RCA + IA sur de nombreux fichiers RCFT.")
+    parser.add_argument("source", help="Dossier de fichiers .rcft ou manifeste (un chemin par ligne)")
+    parser.add_argument("-o", "--output-dir", default="plans", help="Dossier des plans, journaux et du résumé")
+    parser.add_argument("-j", "--processes", type=int, help="Nombre de processus (défaut : nb de CPU)")
+    parser.add_argument("--rate", type=float, default=LLM_RATE, help="Requêtes LLM / seconde pour tout le batch (0 = illimité)")
+    parser.add_argument("--burst", type=int, default=LLM_BURST)
+    args = parser.parse_args()
+    run_batch(args.source, args.output_dir, args.processes, args.rate, args.burst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark de la chaîne RCA sur des RCFT synthétiques (voir rcft_generator.py).
+
+Pour chaque scénario : génération du fichier, chargement texte, compilation et chargement
+binaire (.rcftb), puis pour chaque backend : boucle RCA (temps par itération, voir
+RCAManager.iteration_stats) et construction finale des treillis (à froid, hors cache).
+Les résultats sont écrits en JSON pour comparer deux exécutions (--compare).
+
+Usage : python benchmark_rca.py --scenario small --scenario medium --backend fcbo -o bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+
+from lattice_backends import get_backend
+from rcft_binary import load_compiled, write_compiled
+from rcft_generator import write_rcft
+from rcft_reader import load_data_from_rcft
+
+# Paramètres du générateur + support minimal (les contextes mis à l'échelle explosent sans seuil iceberg)
+SCENARIOS = {
+    'small': (dict(contexts=2, objects=200, attributes=20, density=0.1, relations=1, fanout=3), 2),
+    'medium': (dict(contexts=3, objects=2000, attributes=40, density=0.03, relations=2, fanout=3), 20),
+    'large': (dict(contexts=3, objects=20000, attributes=60, density=0.02, relations=2, fanout=3, sparse=True), 200),
+    'cyclic': (dict(contexts=2, objects=150, attributes=12, density=0.1, relations=2, fanout=1), 6),
+}
+TIMING_KEYS = ('generate_s', 'load_text_s', 'compile_s', 'load_binary_s', 'run_s', 'final_lattices_s')
+
+
+def _timed(fn, repeat=1):
+    """(meilleur temps en secondes, résultat du dernier appel) ; les print du pipeline sont masqués"""
+    best, result = None, None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_scenario(name, params, backends, workdir, min_support=2, min_intent=0, max_steps=3, repeat=1):
+    """Mesures d'un scénario, une entrée par backend"""
+    path = os.path.join(workdir, f"bench_{name}.rcft")
+    generate_s, _ = _timed(lambda: write_rcft(path, **params))
+    load_text_s, manager = _timed(lambda: load_data_from_rcft(path), repeat)
+    compiled = path + "b"
+    compile_s, _ = _timed(lambda: write_compiled(manager, compiled), repeat)
+    load_binary_s, _ = _timed(lambda: load_compiled(compiled), repeat)
+
+    results = []
+    for backend in backends:
+        runs = []
+        for _ in range(repeat):
+            rca = load_compiled(compiled)
+            run_s, _ = _timed(lambda: rca.run(max_steps=max_steps, backend=backend,
+                                              min_support=min_support, min_intent=min_intent,
+                                              scaling_support=min_support)) # Scaling élagué aussi, sinon les scénarios explosent
+            runs.append((run_s, rca))
+        run_s, rca = min(runs, key=lambda r: r[0])
+
+        # Treillis finaux recalculés par une instance neuve du backend (sans état incrémental ni cache)
+        final = {}
+        for ctx_name, ctx in rca.contexts.items():
+            seconds, concepts = _timed(lambda: get_backend(backend).concepts(ctx, min_support, min_intent), repeat)
+            final[ctx_name] = {'seconds': seconds, 'concepts': len(concepts),
+                               'attributes': len(rca.contexts[ctx_name].properties)}
+
+        results.append({
+            'scenario': name,
+            'params': params,
+            'backend': backend,
+            'min_support': min_support,
+            'min_intent': min_intent,
+            'max_steps': max_steps,
+            'generate_s': generate_s,
+            'load_text_s': load_text_s,
+            'compile_s': compile_s,
+            'load_binary_s': load_binary_s,
+            'run_s': run_s,
+            'iterations': rca.iteration_stats,
+            'final_lattices_s': sum(f['seconds'] for f in final.values()),
+            'final_lattices': final,
+        })
+    return results
+
+
+def compare(results, previous):
+    """Affiche, pour chaque (scénario, backend) commun, le rapport nouveau / ancien des temps"""
+    old = {(r['scenario'], r['backend']): r for r in previous['results']}
+    for r in results:
+        ref = old.get((r['scenario'], r['backend']))
+        if ref is None: continue
+        ratios = []
+        for key in TIMING_KEYS:
+            if ref.get(key):
+                ratios.append(f"{key[:-2]} x{r[key] / ref[key]:.2f}")
+        print(f"   [{r['scenario']} / {r['backend']}] " + ", ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RCA sur des RCFT synthétiques.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scénario(s) à exécuter (défaut : small, medium)")
+    parser.add_argument("--backend", action="append", help="Backend(s) de treillis (défaut : incremental, fcbo)")
+    parser.add_argument("--min-support", type=int, help="Remplace le support minimal des scénarios")
+    parser.add_argument("--min-intent", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1, help="Répétitions (le meilleur temps est gardé)")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Fichier de résultats précédent à comparer")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or ['small', 'medium']
+    backends = args.backend or ['incremental', 'fcbo']
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in scenarios:
+            params, min_support = SCENARIOS[name]
+            if args.min_support is not None:
+                min_support = args.min_support
+            print(f"--- Scénario {name} : {params}, support >= {min_support} ---")
+            for r in bench_scenario(name, params, backends, workdir, min_support,
+                                    args.min_intent, args.max_steps, args.repeat):
+                print(f"   [{r['backend']}] chargement texte {r['load_text_s']:.3f}s, binaire {r['load_binary_s']:.3f}s, "
+                      f"RCA {r['run_s']:.3f}s ({len(r['iterations'])} itération(s)), treillis finaux {r['final_lattices_s']:.3f}s")
+                results.append(r)
+
+    report = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"[FIN] Résultats écrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"--- Comparaison avec {args.compare} ---")
+        compare(results, previous)
+
+
+if __name__ == "__main__":
+    main()
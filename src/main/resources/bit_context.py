@@ -0,0 +1,221 @@
+from array import array
+
+
+def iter_bits(bits):
+    """Itère sur les indices des bits à 1 d'un entier (du plus faible au plus fort)"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def popcount(bits):
+    """Nombre de bits à 1"""
+    return bits.bit_count()
+
+
+def bits_from_indices(indices, width):
+    """Construit un bitset à partir d'indices (en O(nb indices + width/8), sans grands entiers intermédiaires)"""
+    buf = bytearray((width + 7) // 8)
+    for i in indices:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def columns_from_rows(rows, width):
+    """Transpose des lignes bitsets en colonnes bitsets (bit i = ligne i)"""
+    indices = [[] for _ in range(width)]
+    for i, row in enumerate(rows):
+        for j in iter_bits(row):
+            indices[j].append(i)
+    return [bits_from_indices(idx, len(rows)) for idx in indices]
+
+
+def columns_from_matrix(matrix, width):
+    """Transpose une matrice de booléens en colonnes bitsets (bit i = ligne i)"""
+    columns = [0] * width
+    for i, row in enumerate(matrix):
+        for j, val in enumerate(row):
+            if val:
+                columns[j] |= 1 << i
+    return columns
+
+
+def existential_columns(rel_columns, extents):
+    """
+    Mise à l'échelle existentielle vectorisée (produit booléen relation × extensions).
+    - rel_columns[j] : bitset des objets source liés à l'objet cible j
+    - extents[k]     : bitset des objets cibles du concept k
+    Résultat[k] : bitset des objets source liés à AU MOINS un objet de extents[k].
+    Les objets cibles absents de la relation (j >= len(rel_columns)) n'ont aucun lien.
+    """
+    mask = (1 << len(rel_columns)) - 1
+    result = []
+    for extent in extents:
+        col = 0
+        for j in iter_bits(extent & mask):
+            col |= rel_columns[j]
+        result.append(col)
+    return result
+
+
+class SparseRelation:
+    """
+    Relation creuse au format CSR : les cibles de l'objet source i sont
+    indices[indptr[i]:indptr[i + 1]]. Mémoire et chargement en O(nnz).
+    L'index inverse (sources de chaque cible) est construit à la première mise à l'échelle.
+    """
+    def __init__(self, n_sources, n_targets, indptr, indices):
+        self.n_sources = n_sources
+        self.n_targets = n_targets
+        self.indptr = array('q', indptr)
+        self.indices = array('q', indices)
+        self._by_target = None
+
+    @classmethod
+    def from_rows(cls, rows_indices, n_targets):
+        """Construit la relation depuis, pour chaque source, la liste des indices cibles"""
+        indptr = [0]
+        indices = array('q')
+        for targets in rows_indices:
+            indices.extend(targets)
+            indptr.append(len(indices))
+        return cls(len(rows_indices), n_targets, indptr, indices)
+
+    @classmethod
+    def from_matrix(cls, matrix, n_targets):
+        """Construit la relation depuis une matrice de booléens (liste de lignes)"""
+        return cls.from_rows([[j for j, val in enumerate(row) if val] for row in matrix], n_targets)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def _sources_by_target(self):
+        if self._by_target is None:
+            by_target = [[] for _ in range(self.n_targets)]
+            indptr, indices = self.indptr, self.indices
+            for i in range(self.n_sources):
+                for k in range(indptr[i], indptr[i + 1]):
+                    by_target[indices[k]].append(i)
+            self._by_target = by_target
+        return self._by_target
+
+    def existential_columns(self, extents):
+        """Même résultat que existential_columns(), en O(liens touchés) par extension"""
+        by_target = self._sources_by_target()
+        mask = (1 << self.n_targets) - 1 # Cibles hors de la relation : aucun lien
+        result = []
+        for extent in extents:
+            linked = []
+            for j in iter_bits(extent & mask):
+                linked.extend(by_target[j])
+            result.append(bits_from_indices(linked, self.n_sources) if linked else 0)
+        return result
+
+    def to_columns(self):
+        """Colonnes bitsets équivalentes (représentation dense)"""
+        return [bits_from_indices(sources, self.n_sources) for sources in self._sources_by_target()]
+
+
+class BoolRows:
+    """
+    Vue paresseuse 'liste de lignes de booléens' sur un BitContext.
+    Permet de donner le contexte à concepts.Context sans construire de liste de listes.
+    """
+    def __init__(self, ctx):
+        self._ctx = ctx
+
+    def __len__(self):
+        return len(self._ctx.objects)
+
+    def __getitem__(self, i):
+        row = self._ctx.rows[i]
+        return tuple(bool(row >> j & 1) for j in range(len(self._ctx.properties)))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class BitContext:
+    """
+    Contexte formel compact.
+    - columns[j] : entier dont le bit i vaut 1 si objects[i] possède properties[j]
+    - rows[i]    : entier dont le bit j vaut 1 si objects[i] possède properties[j]
+    Les deux vues sont maintenues pour que l'ajout d'une colonne reste bon marché.
+    Les index nom -> position (object_index, property_index) évitent toute recherche
+    linéaire dans les listes de noms ; extensions et intensions circulent en bitsets,
+    les noms ne sont matérialisés qu'en sortie (voir Concept).
+    """
+    def __init__(self, objects, properties, columns=None):
+        self.objects = list(objects)
+        self.object_index = {name: i for i, name in enumerate(self.objects)}
+        self.properties = []
+        self.property_index = {}
+        self.columns = []
+        self.rows = [0] * len(self.objects)
+        self.version = 0  # Incrémenté à chaque modification de la matrice
+        for j, name in enumerate(properties):
+            self.add_column(name, columns[j] if columns is not None else 0)
+
+    @classmethod
+    def from_matrix(cls, objects, properties, matrix):
+        """Construit le contexte depuis une matrice de booléens (liste de lignes)"""
+        return cls(objects, properties, columns_from_matrix(matrix, len(properties)))
+
+    @classmethod
+    def from_rows(cls, objects, properties, rows):
+        """Construit le contexte depuis des lignes bitsets (bit j = propriété j), sans repasser par add_column"""
+        return cls.from_bitsets(objects, properties, columns_from_rows(rows, len(properties)), rows)
+
+    @classmethod
+    def from_bitsets(cls, objects, properties, columns, rows):
+        """Construit le contexte depuis ses deux vues déjà calculées (colonnes et lignes)"""
+        ctx = cls(objects, [])
+        ctx.properties = list(properties)
+        ctx.property_index = {name: j for j, name in enumerate(ctx.properties)}
+        ctx.columns = list(columns)
+        ctx.rows = list(rows)
+        return ctx
+
+    @property
+    def all_objects(self):
+        """Bitset de tous les objets"""
+        return (1 << len(self.objects)) - 1
+
+    def add_column(self, name, bits):
+        """Ajoute une propriété (bit i = objet i)"""
+        j = len(self.properties)
+        self.properties.append(name)
+        self.property_index[name] = j
+        self.columns.append(bits)
+        mask = 1 << j
+        for i in iter_bits(bits):
+            self.rows[i] |= mask
+        self.version += 1
+        return j
+
+    def has_property(self, name):
+        return name in self.property_index
+
+    def object_bits(self, names):
+        """Bitset d'un ensemble d'objets donnés par leur nom"""
+        index = self.object_index
+        return bits_from_indices([index[name] for name in names], len(self.objects))
+
+    def property_bits(self, names):
+        """Bitset d'un ensemble de propriétés données par leur nom"""
+        index = self.property_index
+        return bits_from_indices([index[name] for name in names], len(self.properties))
+
+    def bools(self):
+        """Vue 'matrice de booléens' (pour concepts.Context)"""
+        return BoolRows(self)
+
+    def to_matrix(self):
+        """Matrice de booléens explicite (liste de listes)"""
+        return [list(row) for row in self.bools()]
+
+    def __repr__(self):
+        return f"BitContext({len(self.objects)} objets, {len(self.properties)} attributs)"
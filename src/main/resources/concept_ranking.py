@@ -0,0 +1,98 @@
+"""
+Classement des groupes candidats avant l'appel au LLM.
+
+Chaque groupe (objets, attributs) issu du treillis reçoit des scores :
+- support   : nombre d'objets de l'extension
+- intent    : nombre d'attributs de l'intension
+- features  : nombre d'attributs "réels" (hors attributs relationnels rel_...)
+- stability : stabilité intensionnelle du concept (part des sous-ensembles de l'extension
+              ayant la même intension, voir stability.py) ; un concept instable tient à un ou deux objets
+- lift      : log du rapport support observé / support attendu si les attributs étaient indépendants
+Les groupes sont triés selon une liste de métriques (ordre lexicographique, le plus grand d'abord),
+puis seuls les premiers sont gardés (top-K, budget de tokens estimé, nombre de requêtes).
+"""
+import json
+import math
+import random
+
+from bit_context import iter_bits, popcount
+from stability import stability
+
+METRICS = ('support', 'intent', 'features', 'stability', 'lift')
+REL_PREFIX = "rel_"
+STABILITY_SAMPLES = 1024 # Tirages Monte Carlo quand la stabilité exacte est trop coûteuse
+
+
+def parse_metrics(spec):
+    """'features,stability' -> ('features', 'stability') ; ValueError si une métrique est inconnue"""
+    metrics = tuple(m.strip() for m in spec.split(',') if m.strip()) if isinstance(spec, str) else tuple(spec)
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Métrique de classement inconnue : {', '.join(unknown)} (disponibles : {', '.join(METRICS)})")
+    return metrics
+
+
+def estimate_tokens(group):
+    """Estimation grossière du coût d'un groupe dans un prompt (~4 caractères par token)"""
+    objects, attributes = group
+    return len(json.dumps([objects, attributes], ensure_ascii=False)) // 4 + 1
+
+
+def score_groups(ctx, groups, metrics=METRICS):
+    """Scores de chaque groupe (objets, attributs) sur le contexte ctx ; seules les métriques demandées sont calculées"""
+    n = len(ctx.objects) or 1
+    rng = random.Random(0) # Échantillonnage reproductible : même classement d'une exécution à l'autre
+
+    scores = []
+    for objects, attributes in groups:
+        s = {
+            'support': len(objects),
+            'intent': len(attributes),
+            'features': sum(1 for a in attributes if not a.startswith(REL_PREFIX)),
+        }
+        if 'stability' in metrics or 'lift' in metrics:
+            extent_bits = ctx.object_bits(objects)
+            intent_bits = ctx.property_bits(attributes)
+            if 'stability' in metrics:
+                s['stability'] = stability(ctx, extent_bits, intent_bits, STABILITY_SAMPLES, rng=rng).value
+            if 'lift' in metrics:
+                s['lift'] = math.log(popcount(extent_bits) / n) - sum(
+                    math.log(popcount(ctx.columns[j]) / n) for j in iter_bits(intent_bits))
+        scores.append(s)
+    return scores
+
+
+def rank_groups(ctx, groups, rank_by=('features', 'stability', 'support'), top_k=0,
+                token_budget=0, max_groups=0, require_features=False):
+    """
+    Trie les groupes et applique les budgets.
+    - rank_by          : métriques, de la plus importante à la moins importante
+    - top_k            : nombre max de groupes gardés (0 = pas de limite)
+    - token_budget     : coût total estimé max des groupes gardés (0 = pas de limite)
+    - max_groups       : autre plafond (ex: déduit d'un budget de temps), combiné avec top_k
+    - require_features : écarte les groupes dont l'intension n'a que des attributs rel_
+    Retourne (gardés, écartés) : listes de (groupe, scores) ; les écartés portent une raison.
+    """
+    rank_by = parse_metrics(rank_by)
+    scores = score_groups(ctx, groups, rank_by)
+    # Tri stable : à égalité, l'ordre du treillis est conservé
+    order = sorted(range(len(groups)), key=lambda k: tuple(-scores[k][m] for m in rank_by))
+
+    limit = min(x for x in (top_k, max_groups) if x) if (top_k or max_groups) else 0
+    kept, skipped = [], []
+    spent = 0
+    for k in order:
+        group, s = groups[k], scores[k]
+        if require_features and not s['features']:
+            skipped.append((group, dict(s, raison="attributs relationnels uniquement")))
+            continue
+        if limit and len(kept) >= limit:
+            skipped.append((group, dict(s, raison="top-K atteint")))
+            continue
+        cost = estimate_tokens(group)
+        if token_budget and spent + cost > token_budget:
+            skipped.append((group, dict(s, raison="budget de tokens atteint")))
+            continue
+        spent += cost
+        kept.append((group, s))
+    return kept, skipped
@@ -0,0 +1,98 @@
+import weakref
+
+from bit_context import iter_bits, popcount
+
+
+class Concept:
+    """
+    Concept formel (extension, intension) stocké en bitsets.
+    Les noms (extent / intent) ne sont matérialisés qu'à la demande.
+    """
+    __slots__ = ('ctx', 'extent_bits', 'intent_bits', '_extent', '_intent')
+
+    def __init__(self, ctx, extent_bits, intent_bits):
+        self.ctx = ctx
+        self.extent_bits = extent_bits
+        self.intent_bits = intent_bits
+        self._extent = None
+        self._intent = None
+
+    @property
+    def extent(self):
+        if self._extent is None:
+            self._extent = tuple(self.ctx.objects[i] for i in iter_bits(self.extent_bits))
+        return self._extent
+
+    @property
+    def intent(self):
+        if self._intent is None:
+            self._intent = tuple(self.ctx.properties[j] for j in iter_bits(self.intent_bits))
+        return self._intent
+
+    def __repr__(self):
+        return f"Concept({self.extent}, {self.intent})"
+
+
+class IncrementalLattice:
+    """
+    Ensemble des concepts d'un BitContext, mis à jour colonne par colonne (style Godin / AddIntent).
+
+    Les extensions d'un contexte sont stables par intersection : ajouter une colonne m
+    d'extension E ajoute au plus les extensions A ∩ E (A extension existante).
+    - Si A ⊆ E, le concept (A, B) devient (A, B ∪ {m}).
+    - Sinon, A ∩ E est une nouvelle extension ; son intension est celle de sa fermeture
+      dans l'ancien contexte (le plus petit générateur) plus m.
+    Le coût d'un ajout est donc O(|treillis|) au lieu d'une reconstruction complète.
+
+    Mode iceberg (min_support) : une extension ne fait que rétrécir par intersection,
+    donc celles sous le seuil peuvent être oubliées sans fausser les suivantes.
+
+    Le contexte n'est référencé que faiblement : il appartient à son propriétaire (RCAManager,
+    treillis.py), et un cache indexé par contexte (WeakKeyDictionary) peut ainsi le libérer.
+    """
+    def __init__(self, ctx, min_support=0):
+        self._ctx = weakref.ref(ctx)
+        self.min_support = min_support
+        self.width = 0  # Nb de colonnes déjà intégrées
+        self.intents = {}  # extension (bits) -> intension (bits)
+        if popcount(ctx.all_objects) >= min_support:
+            self.intents[ctx.all_objects] = 0
+        self.update()
+
+    @property
+    def ctx(self):
+        return self._ctx()
+
+    def update(self):
+        """Intègre les colonnes ajoutées au contexte depuis le dernier appel"""
+        columns = self.ctx.columns
+        added = 0
+        while self.width < len(columns):
+            self._add_attribute(self.width, columns[self.width])
+            self.width += 1
+            added += 1
+        return added
+
+    def _add_attribute(self, j, col):
+        mask = 1 << j
+        intents = self.intents
+        new_intents = {}
+
+        for ext, intent in intents.items():
+            inter = ext & col
+            if inter == ext:
+                new_intents[ext] = intent | mask
+            elif inter not in intents:
+                if self.min_support and popcount(inter) < self.min_support: continue
+                # L'union des générateurs donne l'intension de la fermeture (le plus grand)
+                new_intents[inter] = new_intents.get(inter, 0) | intent | mask
+
+        intents.update(new_intents)
+
+    def concepts(self, min_intent=0):
+        """Liste des concepts courants (avec au moins min_intent attributs)"""
+        return [Concept(self.ctx, ext, intent) for ext, intent in self.intents.items()
+                if not min_intent or popcount(intent) >= min_intent]
+
+    def __len__(self):
+        return len(self.intents)
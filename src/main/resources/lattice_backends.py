@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import weakref
+
+from bit_context import iter_bits, popcount
+from incremental_lattice import Concept, IncrementalLattice
+
+# La lib concepts n'est nécessaire que pour le backend du même nom
+try:
+    from concepts import Context
+except ImportError:
+    Context = None
+
+
+class LatticeBackend:
+    """
+    Interface d'un moteur de calcul de treillis.
+    concepts(ctx) reçoit un BitContext et retourne une liste d'objets ayant
+    au moins .extent et .intent (tuples de noms), comme attendu par pipeline_rca.py.
+    Mode iceberg : seuls les concepts avec au moins min_support objets
+    et min_intent attributs sont retournés.
+    """
+    name = None
+
+    def concepts(self, ctx, min_support=0, min_intent=0):
+        raise NotImplementedError
+
+
+class ConceptsBackend(LatticeBackend):
+    """Treillis complet (avec arêtes de Hasse) via la lib concepts, en Python pur"""
+    name = 'concepts'
+
+    def concepts(self, ctx, min_support=0, min_intent=0):
+        if Context is None:
+            raise ImportError("La lib 'concepts' n'est pas installée (pip install concepts).")
+        lattice = Context(ctx.objects, ctx.properties, ctx.bools()).lattice
+        if not min_support and not min_intent:
+            return lattice
+        # Le treillis complet est calculé de toute façon : on filtre après coup
+        return [c for c in lattice if len(c.extent) >= min_support and len(c.intent) >= min_intent]
+
+
+class IncrementalBackend(LatticeBackend):
+    """Treillis maintenu colonne par colonne (adapté à la boucle RCA qui ajoute des colonnes)"""
+    name = 'incremental'
+
+    def __init__(self):
+        self._lattices = weakref.WeakKeyDictionary()  # BitContext -> IncrementalLattice
+
+    def concepts(self, ctx, min_support=0, min_intent=0):
+        lattice = self._lattices.get(ctx)
+        if lattice is None or lattice.min_support != min_support:
+            lattice = self._lattices[ctx] = IncrementalLattice(ctx, min_support)
+        else:
+            lattice.update()
+        return lattice.concepts(min_intent)
+
+
+def _up(rows, all_attrs, extent):
+    """Intension d'un ensemble d'objets (attributs communs)"""
+    intent = all_attrs
+    for i in iter_bits(extent):
+        intent &= rows[i]
+        if not intent: break
+    return intent
+
+
+def _fcbo_children(columns, rows, all_attrs, node, min_support=0):
+    """
+    Un pas de FCbO : enfants canoniques d'un noeud (extension, intension, début, échecs).
+    Les intensions ayant échoué le test de canonicité sont transmises aux enfants.
+    Les extensions trop petites (< min_support) sont élaguées : elles ne font que décroître.
+    """
+    extent, intent, start, failed = node
+    m = len(columns)
+    if intent == all_attrs or start >= m:
+        return []
+
+    next_failed = list(failed)
+    children = []
+    for j in range(start, m):
+        if intent >> j & 1: continue
+        lower = (1 << j) - 1
+        # Une fermeture ayant déjà échoué contient un attribut < j absent de B : échec assuré
+        if failed[j] & lower & ~intent: continue
+        new_extent = extent & columns[j]
+        if min_support and popcount(new_extent) < min_support: continue
+        new_intent = _up(rows, all_attrs, new_extent)
+        if (new_intent ^ intent) & lower == 0:
+            children.append((new_extent, new_intent, j + 1))
+        else:
+            next_failed[j] = new_intent
+
+    return [(e, i, y, next_failed) for e, i, y in children]
+
+
+def _fcbo_subtree(columns, rows, node, min_support=0, min_intent=0):
+    """Parcours en profondeur (pile explicite) du sous-arbre FCbO issu d'un noeud"""
+    all_attrs = (1 << len(columns)) - 1
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if popcount(node[1]) >= min_intent:
+            result.append((node[0], node[1]))
+        # Ordre de sortie : celui de FCbO récursif (premier enfant traité en premier)
+        stack.extend(reversed(_fcbo_children(columns, rows, all_attrs, node, min_support)))
+    return result
+
+
+def _fcbo_root(ctx):
+    """Noeud racine de FCbO : le concept le plus général"""
+    m = len(ctx.columns)
+    top_extent = ctx.all_objects
+    return (top_extent, _up(ctx.rows, (1 << m) - 1, top_extent), 0, [0] * m)
+
+
+def fcbo(ctx, min_support=0, min_intent=0):
+    """
+    Énumération des concepts par FCbO (Outrata & Vychodil) sur les bitsets du contexte.
+    Retourne une liste de couples (extension, intension) en bits.
+
+    Chaque concept est produit une seule fois grâce au test de canonicité
+    (D ∩ Y_j == B ∩ Y_j) ; les intensions ayant échoué ce test sont transmises
+    aux descendants pour éviter de recalculer des fermetures vouées à l'échec.
+    Mode iceberg : les branches sous min_support ne sont jamais explorées.
+    """
+    if popcount(ctx.all_objects) < min_support:
+        return []
+    return _fcbo_subtree(ctx.columns, ctx.rows, _fcbo_root(ctx), min_support, min_intent)
+
+
+# --- Version parallèle : les sous-arbres du haut de l'arbre sont répartis sur des processus ---
+
+_worker_columns = None
+_worker_rows = None
+_worker_thresholds = (0, 0)
+
+
+def _init_worker(columns, rows, thresholds=(0, 0)):
+    """Le contexte est transmis une seule fois par processus (hérité sans copie avec fork)"""
+    global _worker_columns, _worker_rows, _worker_thresholds
+    _worker_columns = columns
+    _worker_rows = rows
+    _worker_thresholds = thresholds
+
+
+def _pack_node(node):
+    """Les échecs sont presque tous nuls : on ne transmet que les entrées renseignées"""
+    extent, intent, start, failed = node
+    return extent, intent, start, {j: d for j, d in enumerate(failed) if d}
+
+
+def _worker_subtree(packed):
+    extent, intent, start, failed_items = packed
+    failed = [0] * len(_worker_columns)
+    for j, d in failed_items.items():
+        failed[j] = d
+    return _fcbo_subtree(_worker_columns, _worker_rows, (extent, intent, start, failed), *_worker_thresholds)
+
+
+def parallel_fcbo(ctx, processes=None, split_depth=2, min_support=0, min_intent=0):
+    """
+    FCbO multi-processus : les split_depth premiers niveaux de l'arbre de recherche
+    sont développés ici, puis chaque sous-arbre restant est énuméré par un worker.
+    Les branches sont indépendantes (canonicité + échecs hérités) : il suffit
+    de concaténer les résultats, dans l'ordre des tâches.
+    """
+    columns, rows = ctx.columns, ctx.rows
+    all_attrs = (1 << len(columns)) - 1
+    processes = processes or os.cpu_count() or 1
+    if popcount(ctx.all_objects) < min_support:
+        return []
+
+    result = []
+    frontier = [_fcbo_root(ctx)]
+    for _ in range(split_depth):
+        next_frontier = []
+        for node in frontier:
+            if popcount(node[1]) >= min_intent:
+                result.append((node[0], node[1]))
+            next_frontier.extend(_fcbo_children(columns, rows, all_attrs, node, min_support))
+        frontier = next_frontier
+        if len(frontier) >= processes * 4: break
+
+    # Dans un worker de pool (processus démon, ex: batch_rca.py), pas de processus enfants : version séquentielle
+    if processes < 2 or len(frontier) < 2 or multiprocessing.current_process().daemon:
+        for node in frontier:
+            result.extend(_fcbo_subtree(columns, rows, node, min_support, min_intent))
+        return result
+
+    methods = multiprocessing.get_all_start_methods()
+    mp_ctx = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with mp_ctx.Pool(processes, initializer=_init_worker, initargs=(columns, rows, (min_support, min_intent))) as pool:
+        for subtree in pool.imap(_worker_subtree, [_pack_node(node) for node in frontier]):
+            result.extend(subtree)
+    return result
+
+
+class FCbOBackend(LatticeBackend):
+    """Énumération rapide des concepts fermés (FCbO sur bitsets), sans arêtes de Hasse"""
+    name = 'fcbo'
+
+    def concepts(self, ctx, min_support=0, min_intent=0):
+        return [Concept(ctx, extent, intent) for extent, intent in fcbo(ctx, min_support, min_intent)]
+
+
+class ParallelFCbOBackend(LatticeBackend):
+    """FCbO réparti sur plusieurs processus (petits contextes : version séquentielle)"""
+    name = 'fcbo-parallel'
+
+    def __init__(self, processes=None, split_depth=2, min_size=100_000):
+        self.processes = processes
+        self.split_depth = split_depth
+        self.min_size = min_size # En dessous (objets × attributs), le pool coûte plus qu'il ne rapporte
+
+    def concepts(self, ctx, min_support=0, min_intent=0):
+        if len(ctx.objects) * len(ctx.properties) < self.min_size:
+            pairs = fcbo(ctx, min_support, min_intent)
+        else:
+            pairs = parallel_fcbo(ctx, self.processes, self.split_depth, min_support, min_intent)
+        return [Concept(ctx, extent, intent) for extent, intent in pairs]
+
+
+BACKENDS = {
+    ConceptsBackend.name: ConceptsBackend,
+    IncrementalBackend.name: IncrementalBackend,
+    FCbOBackend.name: FCbOBackend,
+    ParallelFCbOBackend.name: ParallelFCbOBackend,
+}
+
+
+def get_backend(backend):
+    """Retourne une instance de backend à partir de son nom (ou l'instance elle-même)"""
+    if isinstance(backend, LatticeBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de treillis inconnu : '{backend}' (disponibles : {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def cache_key(model, prompt, objects, attributes):
+    """
+    Clé adressée par le contenu : modèle + prompt système + signature normalisée du groupe.
+    L'ordre des objets et des attributs n'a pas d'influence sur la clé.
+    """
+    signature = {"objects": sorted(objects), "attributes": sorted(attributes)}
+    raw = json.dumps([model, prompt, signature], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    Cache persistant (SQLite) des décisions du LLM.
+    - max_entries : au-delà, les entrées les moins récemment lues sont évincées (LRU)
+    - ttl : durée de vie en secondes d'une entrée (None = illimitée)
+    Une même instance peut être partagée entre threads.
+    """
+    def __init__(self, path, max_entries=10000, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL") # Lecteurs et écrivain concurrents (plusieurs processus)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache(last_access)")
+        self.conn.commit()
+
+    def get(self, key):
+        """Décision en cache (dict) ou None ; met à jour la date d'accès"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key, value):
+        """Enregistre une décision puis évince les entrées les plus anciennes si besoin"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            if self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def stats(self):
+        """Compteurs de la session courante"""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
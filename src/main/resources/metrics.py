@@ -0,0 +1,163 @@
+"""
+Instrumentation de la chaîne RCA : chronos par phase, compteurs, pic mémoire.
+
+- phase(nom)     : bloc 'with' chronométré (temps réel et CPU du processus, nb d'appels)
+- count(nom, n)  : compteur (concepts énumérés, colonnes relationnelles, itérations, cache...)
+- pic mémoire    : via tracemalloc (global et par phase), seulement si memory=True
+
+Désactivé par défaut : phase() renvoie alors un contexte vide et count() ne fait rien,
+sans aucun print. Activation par code (get_metrics().enable(...)) ou par variables
+d'environnement (voir enable_from_env) ; export en JSON ou au format texte Prometheus.
+Les phases sont prévues pour le thread principal ; count() peut être appelé depuis n'importe quel thread.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+PROMETHEUS_PREFIX = "rca_"
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.timers = {}    # phase -> {'wall': s, 'cpu': s, 'calls': n}
+        self.counters = {}  # nom -> valeur
+        self.peaks = {}     # phase -> pic mémoire (octets) pendant la phase
+        self.peak_bytes = 0
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def enable(self, memory=False):
+        """Active la collecte ; memory=True démarre tracemalloc (surcoût notable)"""
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.memory and tracemalloc.is_tracing():
+            self._fold_peak()
+            tracemalloc.stop()
+        self.memory = False
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.peaks.clear()
+            self.peak_bytes = 0
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_counter(self, name, value):
+        """Valeur absolue (ex: statistiques déjà tenues ailleurs, comme le cache LLM)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = value
+
+    def _fold_peak(self):
+        """Reporte le pic courant de tracemalloc sur les phases ouvertes et le pic global"""
+        peak = tracemalloc.get_traced_memory()[1]
+        for name in self._stack:
+            self.peaks[name] = max(self.peaks.get(name, 0), peak)
+        self.peak_bytes = max(self.peak_bytes, peak)
+
+    def phase(self, name):
+        """Bloc chronométré : with get_metrics().phase('scaling'): ..."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._phase(name)
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        if self.memory:
+            # Pic remis à zéro en entrée : il est d'abord reporté sur les phases englobantes
+            self._fold_peak()
+            tracemalloc.reset_peak()
+        self._stack.append(name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            if self.memory:
+                self._fold_peak()
+            self._stack.pop()
+            with self._lock:
+                timer = self.timers.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+                timer['wall'] += wall
+                timer['cpu'] += cpu
+                timer['calls'] += 1
+
+    def to_dict(self):
+        if self.memory and tracemalloc.is_tracing():
+            self._fold_peak()
+        with self._lock:
+            data = {
+                'phases': {name: dict(t) for name, t in self.timers.items()},
+                'counters': dict(self.counters),
+            }
+            if self.memory:
+                data['memory'] = {'peak_bytes': self.peak_bytes, 'phases': dict(self.peaks)}
+        return data
+
+    def to_prometheus(self):
+        """Format d'exposition texte de Prometheus"""
+        data = self.to_dict()
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# TYPE {p}phase_wall_seconds counter",
+            *(f'{p}phase_wall_seconds{{phase="{name}"}} {t["wall"]:.6f}' for name, t in data['phases'].items()),
+            f"# TYPE {p}phase_cpu_seconds counter",
+            *(f'{p}phase_cpu_seconds{{phase="{name}"}} {t["cpu"]:.6f}' for name, t in data['phases'].items()),
+            f"# TYPE {p}phase_calls counter",
+            *(f'{p}phase_calls{{phase="{name}"}} {t["calls"]}' for name, t in data['phases'].items()),
+        ]
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"# TYPE {p}{name} counter")
+            lines.append(f"{p}{name} {value}")
+        if 'memory' in data:
+            lines.append(f"# TYPE {p}peak_memory_bytes gauge")
+            lines.append(f"{p}peak_memory_bytes {data['memory']['peak_bytes']}")
+            lines.append(f"# TYPE {p}phase_peak_memory_bytes gauge")
+            lines.extend(f'{p}phase_peak_memory_bytes{{phase="{name}"}} {peak}'
+                         for name, peak in data['memory']['phases'].items())
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Écrit les métriques : .prom / .txt -> Prometheus, sinon JSON"""
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Collecteur partagé du processus"""
+    return _metrics
+
+
+def enable_from_env():
+    """
+    RCA_METRICS=chemin (ex: metrics.json ou metrics.prom) active la collecte,
+    RCA_METRICS_MEMORY=1 ajoute le suivi mémoire. Retourne le chemin d'export (ou None).
+    """
+    path = os.getenv("RCA_METRICS")
+    if path:
+        _metrics.enable(memory=os.getenv("RCA_METRICS_MEMORY", "0") == "1")
+    return path or None
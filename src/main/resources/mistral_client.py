@@ -0,0 +1,479 @@
+import os
+import json
+import time
+import random
+import threading
+import multiprocessing
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests # On utilise requests pour appeler Mistral simplement
+
+from llm_cache import LLMCache, cache_key
+from metrics import get_metrics
+
+# --- CONFIGURATION ---
+# Remplace os.getenv par ta clé "dur" si besoin pour les tests
+API_KEY = os.getenv("MISTRAL_API_KEY")
+MISTRAL_URL = os.getenv("MISTRAL_API_URL", "https://api.mistral.ai/v1/chat/completions")
+MISTRAL_MODEL = "mistral-large-latest" # ou "open-mistral-7b" (moins cher/gratuit)
+
+# Cache local des décisions (un hit évite l'appel HTTP) ; LLM_CACHE_PATH vide = désactivé
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+LLM_CACHE_MAX = int(os.getenv("LLM_CACHE_MAX", "10000"))  # Nb d'entrées max (éviction LRU)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "0"))    # Durée de vie en secondes (0 = illimitée)
+
+# Transport HTTP : connexions réutilisées, retries avec backoff, disjoncteur
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))           # Timeout d'une requête (s)
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))         # Connexions keep-alive max
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))      # Nouvelles tentatives par requête
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5")) # Délai initial du backoff (s)
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))   # Délai max entre deux tentatives (s)
+LLM_ERROR_BUDGET = int(os.getenv("LLM_ERROR_BUDGET", "10"))   # Échecs consécutifs avant d'ouvrir le disjoncteur
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "60")) # Durée d'ouverture (s) avant un nouvel essai
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Prompt système strict pour forcer le JSON
+SYSTEM_PROMPT = """
+    Tu es un Architecte Logiciel Senior expert en Refactoring UML.
+    Ta mission : Analyser des regroupements de classes et décider si une abstraction est nécessaire.
+    Format de réponse OBLIGATOIRE : JSON valide uniquement.
+    Champs du JSON :
+    - "decision": "INTERFACE" (si comportement commun), "HERITAGE" (si nature commune), ou "RIEN".
+    - "nom_suggere": Le nom du nouveau concept (CamelCase).
+    - "justification": Courte phrase explicative.
+    """
+
+# Variante par lots : plusieurs groupes dans une seule requête, le prompt système n'est envoyé qu'une fois
+BATCH_SYSTEM_PROMPT = """
+    Tu es un Architecte Logiciel Senior expert en Refactoring UML.
+    Ta mission : Analyser plusieurs regroupements de classes (chacun identifié par "id")
+    et décider pour chacun si une abstraction est nécessaire.
+    Format de réponse OBLIGATOIRE : JSON valide uniquement, de la forme {"resultats": [...]}
+    avec exactement un élément par groupe reçu. Champs de chaque élément :
+    - "id": L'identifiant du groupe.
+    - "decision": "INTERFACE" (si comportement commun), "HERITAGE" (si nature commune), ou "RIEN".
+    - "nom_suggere": Le nom du nouveau concept (CamelCase).
+    - "justification": Courte phrase explicative.
+    """
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Cache partagé du processus, ouvert à la première utilisation (None si désactivé)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None and LLM_CACHE_PATH:
+            _cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_MAX, LLM_CACHE_TTL or None)
+        return _cache
+
+def set_cache(cache):
+    """Remplace le cache partagé (ex: autre fichier, ou None pour le désactiver)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+# --- 1. TRANSPORT HTTP (SESSION PARTAGÉE, RETRIES, DISJONCTEUR) ---
+
+class CircuitBreaker:
+    """
+    Disjoncteur : après error_budget échecs consécutifs, il s'ouvre et toutes les requêtes
+    passent directement en fallback ; après cooldown secondes, il passe semi-ouvert et admet
+    une seule requête d'essai (les appels concurrents restent refusés) jusqu'à son issue :
+    un succès le referme, un échec le rouvre pour un nouveau cooldown.
+    """
+    def __init__(self, error_budget, cooldown):
+        self.error_budget = error_budget
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False # Requête d'essai en cours (état semi-ouvert)
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            # Semi-ouvert : une seule requête d'essai. Si son issue n'est jamais signalée,
+            # un nouvel essai est permis au bout d'un autre cooldown.
+            self.trial = True
+            self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial:
+                self.trial = False
+                self.opened_at = time.monotonic()
+                print("[IA ERROR] Requête d'essai en échec : disjoncteur rouvert.")
+            elif self.failures >= self.error_budget and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                print(f"[IA ERROR] Disjoncteur ouvert après {self.failures} échecs consécutifs.")
+
+_session = None
+_breaker = None
+_transport_lock = threading.Lock()
+
+def get_session():
+    """Session HTTP partagée (keep-alive, pool de connexions)"""
+    global _session
+    with _transport_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=LLM_POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+def get_breaker():
+    """Disjoncteur partagé du processus"""
+    global _breaker
+    with _transport_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(LLM_ERROR_BUDGET, LLM_BREAKER_COOLDOWN)
+        return _breaker
+
+def _retry_after(response):
+    """Délai demandé par le serveur (en-tête Retry-After, en secondes ou date HTTP), sinon None"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _backoff_delay(attempt, retry_after=None):
+    """Backoff exponentiel avec jitter complet ; Retry-After est respecté s'il est plus long"""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, LLM_BACKOFF_MAX))
+    return delay
+
+def _post_chat(payload, limiter=None):
+    """
+    Envoie une requête de chat à Mistral (session partagée, retries avec backoff).
+    Retourne le contenu texte de la réponse, ou None si l'appel a échoué
+    (disjoncteur ouvert, erreur définitive ou tentatives épuisées).
+    """
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json",
+        "Accept": "application/json"
+    }
+    session = get_session()
+    breaker = get_breaker()
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        if not breaker.allow():
+            print("[IA ERROR] Disjoncteur ouvert : appel Mistral non tenté.")
+            return None
+        if limiter is not None:
+            limiter.acquire()
+
+        retry_after = None
+        get_metrics().count('llm_requests')
+        try:
+            response = session.post(MISTRAL_URL, headers=headers, json=payload, timeout=LLM_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            print(f"[IA ERROR] Erreur réseau Mistral (tentative {attempt + 1}) : {e}")
+            breaker.record_failure()
+        else:
+            if response.status_code == 200:
+                breaker.record_success()
+                result = response.json()
+                content = result['choices'][0]['message']['content']
+                # Nettoyage au cas où le modèle ajoute du markdown ```json ... ```
+                return content.replace("```json", "").replace("```", "").strip()
+
+            breaker.record_failure()
+            if response.status_code not in RETRY_STATUSES:
+                print(f"[IA ERROR] Erreur API Mistral : {response.status_code} - {response.text}")
+                return None
+            if response.status_code == 429:
+                print(f"[IA ERROR] Quota Mistral dépassé (429), tentative {attempt + 1}.")
+            else:
+                print(f"[IA ERROR] Erreur transitoire Mistral : {response.status_code}, tentative {attempt + 1}.")
+            retry_after = _retry_after(response)
+
+        if attempt < LLM_MAX_RETRIES:
+            time.sleep(_backoff_delay(attempt, retry_after))
+
+    print(f"[IA ERROR] Abandon après {LLM_MAX_RETRIES + 1} tentatives.")
+    return None
+
+# --- 2. APPEL UNITAIRE (MISTRAL + FALLBACK) ---
+
+def simulate_response(objects):
+    """Réponse de secours quand l'IA est hors quota ou plante."""
+    print(f"   [FALLBACK] Génération d'une réponse simulée pour {objects}...")
+    get_metrics().count('llm_fallbacks')
+    objs_str = " ".join(objects).lower()
+
+    if "moto" in objs_str or "voiture" in objs_str:
+        return {"decision": "HERITAGE", "nom_suggere": "Vehicule", "justification": "Partage de propriétés physiques (simulation)."}
+    if "manager" in objs_str or "director" in objs_str or "developer" in objs_str:
+        return {"decision": "HERITAGE", "nom_suggere": "Employee", "justification": "Membres du personnel (simulation)."}
+    if "charrue" in objs_str or "tracteur" in objs_str:
+        return {"decision": "INTERFACE", "nom_suggere": "MachineAgricole", "justification": "Outils agricoles (simulation)."}
+
+    return {"decision": "HERITAGE", "nom_suggere": "ConceptCommun", "justification": "Regroupement par défaut."}
+
+def ask_mistral(context_name, objects, attributes, limiter=None):
+    """
+    Interroge l'API Mistral via une requête HTTP standard.
+    La décision est d'abord cherchée dans le cache local ; limiter (TokenBucket)
+    n'est consommé que pour un vrai appel HTTP.
+    """
+    clean_attrs = [a.replace("rel_", "Relation vers ") for a in attributes]
+
+    # 0. Cache : même modèle, même prompt, même groupe -> même décision
+    cache = get_cache()
+    key = cache_key(MISTRAL_MODEL, SYSTEM_PROMPT, objects, attributes)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    # 1. Si pas de clé, simulation directe
+    if not API_KEY:
+        print("[WARN] Pas de MISTRAL_API_KEY trouvée.")
+        return simulate_response(objects)
+
+    # 2. Préparation de la requête Mistral
+    user_message = f"""
+    Groupe de classes : {", ".join(objects)}
+    Attributs/Méthodes partagés : {json.dumps(clean_attrs, ensure_ascii=False)}
+
+    Quelle est ta décision architecturale ?
+    """
+
+    payload = {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ],
+        "response_format": {"type": "json_object"}, # Force le mode JSON de Mistral
+        "temperature": 0.2
+    }
+
+    # 3. Appel API : session partagée, retries avec backoff, fallback si l'appel échoue
+    try:
+        content = _post_chat(payload, limiter)
+        if content is None:
+            return simulate_response(objects)
+        decision = json.loads(content)
+        # Seules les vraies réponses sont mises en cache, jamais les simulations
+        if cache is not None:
+            cache.put(key, decision)
+        return decision
+
+    except Exception as e:
+        print(f"[IA CRITICAL] Exception lors de l'appel Mistral : {e}")
+        return simulate_response(objects)
+
+def _parse_batch(content, ids):
+    """
+    Décisions d'une réponse par lots, indexées par id de groupe.
+    Les éléments mal formés ou d'id inconnu sont ignorés (le groupe sera redemandé).
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    items = data.get("resultats") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return {}
+
+    decisions = {}
+    for item in items:
+        if not isinstance(item, dict) or item.get("id") not in ids or "decision" not in item:
+            continue
+        decisions[item["id"]] = {k: v for k, v in item.items() if k != "id"}
+    return decisions
+
+def ask_mistral_batch(context_name, groups, limiter=None):
+    """
+    Interroge Mistral pour plusieurs groupes (objets, attributs) en une seule requête.
+    La réponse (tableau JSON) est ramenée groupe par groupe via leur id ; si elle est
+    mal formée ou incomplète, les groupes manquants sont redemandés en deux lots plus petits,
+    jusqu'à l'appel unitaire (ask_mistral). Retourne les décisions dans l'ordre des groupes.
+    """
+    if len(groups) == 1:
+        objects, attributes = groups[0]
+        return [ask_mistral(context_name, objects, attributes, limiter)]
+
+    results = [None] * len(groups)
+
+    # 0. Cache : seuls les groupes absents partent dans le lot. Clé sur le prompt réellement envoyé :
+    #    modifier BATCH_SYSTEM_PROMPT invalide ces décisions, distinctes de celles des appels unitaires
+    cache = get_cache()
+    keys = [cache_key(MISTRAL_MODEL, BATCH_SYSTEM_PROMPT, objects, attributes) for objects, attributes in groups]
+    pending = []
+    for k, key in enumerate(keys):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[k] = cached
+        else:
+            pending.append(k)
+    if not pending:
+        return results
+
+    # 1. Si pas de clé, simulation directe
+    if not API_KEY:
+        print("[WARN] Pas de MISTRAL_API_KEY trouvée.")
+        for k in pending:
+            results[k] = simulate_response(groups[k][0])
+        return results
+
+    # 2. Un seul message pour tout le lot (id = position du groupe dans le lot)
+    batch = [{"id": k,
+              "classes": groups[k][0],
+              "attributs": [a.replace("rel_", "Relation vers ") for a in groups[k][1]]}
+             for k in pending]
+    user_message = f"""
+    Groupes à analyser : {json.dumps(batch, ensure_ascii=False)}
+
+    Quelle est ta décision architecturale pour chaque groupe ?
+    """
+
+    payload = {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.2
+    }
+
+    # 3. Appel API ; en cas d'échec de transport, chaque groupe retombe sur la simulation
+    try:
+        content = _post_chat(payload, limiter)
+    except Exception as e:
+        print(f"[IA CRITICAL] Exception lors de l'appel Mistral (lot) : {e}")
+        content = None
+    if content is None:
+        for k in pending:
+            results[k] = simulate_response(groups[k][0])
+        return results
+
+    # 4. Réponses ramenées aux groupes ; seules les vraies réponses sont mises en cache
+    decisions = _parse_batch(content, set(pending))
+    for k, decision in decisions.items():
+        results[k] = decision
+        if cache is not None:
+            cache.put(keys[k], decision)
+
+    # 5. Réponse mal formée ou incomplète : on coupe en deux et on redemande
+    missing = [k for k in pending if k not in decisions]
+    if missing:
+        print(f"[IA ERROR] Réponse par lot incomplète ({len(missing)}/{len(pending)} groupe(s) manquant(s)), nouvel essai par moitiés.")
+        half = (len(missing) + 1) // 2
+        for part in (missing[:half], missing[half:]):
+            if not part: continue
+            for k, decision in zip(part, ask_mistral_batch(context_name, [groups[k] for k in part], limiter)):
+                results[k] = decision
+    return results
+
+# --- 3. EXÉCUTION CONCURRENTE ET LIMITÉE EN DÉBIT ---
+
+class TokenBucket:
+    """
+    Limiteur de débit (seau à jetons), partagé entre threads.
+    rate : jetons ajoutés par seconde, capacity : rafale maximale autorisée.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        if not self.rate:
+            return # Pas de limite
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedTokenBucket:
+    """
+    Seau à jetons partagé entre processus (mémoire partagée multiprocessing) :
+    même interface que TokenBucket, à créer avant le pool et à transmettre aux workers.
+    """
+    def __init__(self, rate, capacity=1, mp_context=None):
+        mp_context = mp_context or multiprocessing
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = mp_context.Value('d', capacity, lock=False)
+        self.updated = mp_context.Value('d', time.monotonic(), lock=False)
+        self.lock = mp_context.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        if not self.rate:
+            return # Pas de limite
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens.value = min(self.capacity, self.tokens.value + (now - self.updated.value) * self.rate)
+                self.updated.value = now
+                if self.tokens.value >= 1:
+                    self.tokens.value -= 1
+                    return
+                wait = (1 - self.tokens.value) / self.rate
+            time.sleep(wait)
+
+
+def ask_mistral_many(context_name, groups, concurrency=1, rate=None, burst=1, batch_size=1, limiter=None):
+    """
+    Interroge Mistral pour une liste de groupes (objets, attributs).
+    - concurrency : nombre d'appels simultanés (1 = séquentiel, comme avant)
+    - rate / burst : limite de requêtes par seconde (seau à jetons)
+    - batch_size : nombre de groupes envoyés par requête (1 = un appel par groupe)
+    - limiter : limiteur externe (ex: SharedTokenBucket d'un pool de processus), remplace rate / burst
+    Les réponses sont retournées dans l'ordre des groupes ; chaque échec retombe sur simulate_response.
+    """
+    bucket = limiter if limiter is not None else TokenBucket(rate, burst)
+    batch_size = max(1, batch_size)
+    batches = [groups[k:k + batch_size] for k in range(0, len(groups), batch_size)]
+
+    def ask(batch):
+        try:
+            return ask_mistral_batch(context_name, batch, limiter=bucket)
+        except Exception as e:
+            print(f"[IA CRITICAL] Exception inattendue pour {[objects for objects, _ in batch]} : {e}")
+            return [simulate_response(objects) for objects, _ in batch]
+
+    if concurrency <= 1:
+        answers = [ask(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # map conserve l'ordre d'entrée : le plan JSON reste déterministe
+            answers = list(pool.map(ask, batches))
+    return [decision for answer in answers for decision in answer]
@@ -1,199 +1,211 @@
 import os
+import sys
 import json
-import time
-import requests # On utilise requests pour appeler Mistral simplement
+import argparse
+import contextlib
+import io
+import socketserver
 
 # Import du moteur RCA
 try:
-    from rca_engine import RCAManager
+    from rcft_reader import load_data_from_rcft
+    from rcft_binary import load_checkpoint, load_rcft_cached, write_checkpoint
+    from mistral_client import ask_mistral_many, get_cache
+    from concept_ranking import rank_groups
+    from metrics import enable_from_env, get_metrics
 except ImportError:
-    print("[ERREUR] Le fichier 'rca_engine.py' est introuvable.")
+    print("[ERREUR] Un des modules du pipeline (rca_engine, rcft_reader, rcft_binary, mistral_client, concept_ranking, metrics) est introuvable.")
     exit(1)
 
 # --- CONFIGURATION ---
-# Remplace os.getenv par ta clé "dur" si besoin pour les tests
-API_KEY = os.getenv("MISTRAL_API_KEY")
+# La clé et le modèle Mistral se règlent dans mistral_client.py (MISTRAL_API_KEY)
 RCFT_PATH = 'sortie.rcft'
 OUTPUT_JSON = 'plan_amelioration.json'
-MISTRAL_MODEL = "mistral-large-latest" # ou "open-mistral-7b" (moins cher/gratuit)
-
-# --- 1. CHARGEMENT DONNÉES (Identique) ---
-
-def parse_grid(lines):
-    col_names = []
-    row_names = []
-    matrix = []
-    header_index = -1
-    for i, line in enumerate(lines):
-        if line.strip().startswith('|'):
-            parts = [p.strip() for p in line.split('|')]
-            col_names = [c for c in parts[2:] if c]
-            header_index = i
-            break
-    if header_index == -1: return None, None, None
-    for line in lines[header_index + 1:]:
-        if not line.strip().startswith('|'): continue
-        parts = line.split('|')
-        if len(parts) < 2: continue
-        obj_name = parts[1].strip()
-        if not obj_name: continue
-        row_names.append(obj_name)
-        row_bools = []
-        values = parts[2:]
-        for i in range(len(col_names)):
-            is_present = False
-            if i < len(values) and values[i].strip().lower() == 'x': is_present = True
-            row_bools.append(is_present)
-        matrix.append(row_bools)
-    return row_names, col_names, matrix
-
-def load_data_from_rcft(filepath):
-    print(f"--- Lecture du fichier {filepath} ---")
-    rca = RCAManager()
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        print(f"[ERREUR] Fichier {filepath} introuvable.")
-        return None
-    blocks = []
-    current_block = []
-    for line in lines:
-        if any(line.strip().startswith(k) for k in ["FormalContext", "RelationalContext"]) and current_block:
-            blocks.append(current_block)
-            current_block = []
-        current_block.append(line)
-    if current_block: blocks.append(current_block)
-    for block in blocks:
-        header = block[0].strip()
-        if header.startswith("FormalContext"):
-            ctx_name = header.split(" ")[1].strip()
-            r, c, m = parse_grid(block)
-            if r: rca.add_context(ctx_name, r, c, m)
-        elif header.startswith("RelationalContext"):
-            src, tgt = None, None
-            for l in block:
-                if "source" in l: src = l.split("source")[1].strip()
-                if "target" in l: tgt = l.split("target")[1].strip()
-            if src and tgt:
-                r, c, m = parse_grid(block)
-                if r: rca.add_relation(src, tgt, m)
-    return rca
+RCA_BACKEND = os.getenv("RCA_BACKEND", "incremental") # ou "fcbo" / "fcbo-parallel" / "concepts"
+MIN_SUPPORT = 2 # Mode iceberg : un groupe doit contenir au moins 2 classes...
+MIN_INTENT = 1  # ... et partager au moins 1 attribut
+SCALING_SUPPORT = int(os.getenv("RCA_SCALING_SUPPORT", "0")) # Élague les petits concepts cibles du scaling (0 = aucun)
+USE_COMPILED_RCFT = os.getenv("RCFT_COMPILED", "1") != "0" # Cache binaire .rcftb
+USE_CHECKPOINT = os.getenv("RCA_CHECKPOINT", "1") != "0" # Point de reprise de la boucle RCA (.rcft.ckpt)
+USE_DIFF = os.getenv("RCA_DIFF", "1") != "0" # Modèle modifié : ne recalculer que les contextes touchés (point de reprise requis)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4")) # Appels Mistral simultanés (1 = séquentiel)
+LLM_RATE = float(os.getenv("LLM_RATE", "1"))             # Requêtes / seconde max (0 = illimité)
+LLM_BURST = int(os.getenv("LLM_BURST", "1"))             # Rafale autorisée par le limiteur
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "10"))  # Groupes par requête Mistral (1 = un appel par groupe)
+
+# Classement des groupes avant l'IA (voir concept_ranking.py) et budgets (0 = pas de limite)
+LLM_RANK_BY = os.getenv("LLM_RANK_BY", "features,stability,support") # support / intent / features / stability / lift
+LLM_TOP_K = int(os.getenv("LLM_TOP_K", "0"))                  # Nb max de groupes envoyés
+LLM_TOKEN_BUDGET = int(os.getenv("LLM_TOKEN_BUDGET", "0"))    # Tokens de prompt estimés max
+LLM_TIME_BUDGET = float(os.getenv("LLM_TIME_BUDGET", "0"))    # Secondes max (déduit de LLM_RATE et des lots)
+LLM_REQUIRE_FEATURES = os.getenv("LLM_REQUIRE_FEATURES", "0") == "1" # Écarte les groupes 100% rel_
+SKIPPED_JSON = 'groupes_ignores.json'
+# Instrumentation (voir metrics.py) : RCA_METRICS=metrics.json ou metrics.prom, RCA_METRICS_MEMORY=1
+RCA_MEMO_MAX = int(os.getenv("RCA_MEMO_MAX", "16")) # Mode worker : résultats RCA gardés en mémoire (modèles inchangés)
+
+# --- 1. CHARGEMENT DONNÉES ---
+# Lecture RCFT en flux, partagée avec load_rcft.py (voir rcft_reader.py).
+# Par défaut on passe par le compagnon binaire sortie.rcftb (recompilé s'il est périmé).
 
 # --- 2. INTELLIGENCE ARTIFICIELLE (MISTRAL + FALLBACK) ---
+# Appels Mistral (par lots, concurrents, limités en débit) : voir mistral_client.py
 
-def simulate_response(objects):
-    """Réponse de secours quand l'IA est hors quota ou plante."""
-    print(f"   [FALLBACK] Génération d'une réponse simulée pour {objects}...")
-    objs_str = " ".join(objects).lower()
-
-    if "moto" in objs_str or "voiture" in objs_str:
-        return {"decision": "HERITAGE", "nom_suggere": "Vehicule", "justification": "Partage de propriétés physiques (simulation)."}
-    if "manager" in objs_str or "director" in objs_str or "developer" in objs_str:
-        return {"decision": "HERITAGE", "nom_suggere": "Employee", "justification": "Membres du personnel (simulation)."}
-    if "charrue" in objs_str or "tracteur" in objs_str:
-        return {"decision": "INTERFACE", "nom_suggere": "MachineAgricole", "justification": "Outils agricoles (simulation)."}
-
-    return {"decision": "HERITAGE", "nom_suggere": "ConceptCommun", "justification": "Regroupement par défaut."}
-
-def ask_mistral(context_name, objects, attributes):
-    """Interroge l'API Mistral via une requête HTTP standard."""
-    clean_attrs = [a.replace("rel_", "Relation vers ") for a in attributes]
-
-    # 1. Si pas de clé, simulation directe
-    if not API_KEY:
-        print("[WARN] Pas de MISTRAL_API_KEY trouvée.")
-        return simulate_response(objects)
-
-    # 2. Préparation de la requête Mistral
-    url = "https://api.mistral.ai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
-
-    # Prompt système strict pour forcer le JSON
-    system_prompt = """
-    Tu es un Architecte Logiciel Senior expert en Refactoring UML.
-    Ta mission : Analyser des regroupements de classes et décider si une abstraction est nécessaire.
-    Format de réponse OBLIGATOIRE : JSON valide uniquement.
-    Champs du JSON :
-    - "decision": "INTERFACE" (si comportement commun), "HERITAGE" (si nature commune), ou "RIEN".
-    - "nom_suggere": Le nom du nouveau concept (CamelCase).
-    - "justification": Courte phrase explicative.
-    """
+# --- 3. EXÉCUTION ---
+
+# Résultats RCA déjà calculés : chemin du .rcft -> (signature, manager, treillis)
+_rca_memo = {}
+# Mode différentiel : chemin du .rcft -> groupes de l'exécution précédente (avant modification du modèle)
+_previous_groups = {}
+
+def extract_groups(concepts):
+    """Groupes candidats (objets triés, attributs) d'un treillis, sans doublon d'extension"""
+    groups = []
+    processed = set()
+    for concept in concepts:
+        objs = sorted(list(concept.extent))
+        attrs = list(concept.intent)
+
+        # Filtre : Il faut au moins 2 objets et des attributs communs
+        if len(objs) < 2 or len(attrs) == 0: continue
 
-    user_message = f"""
-    Groupe de classes : {", ".join(objects)}
-    Attributs/Méthodes partagés : {json.dumps(clean_attrs, ensure_ascii=False)}
+        # Évite les doublons
+        if tuple(objs) in processed: continue
+        processed.add(tuple(objs))
+        groups.append((objs, attrs))
+    return groups
 
-    Quelle est ta décision architecturale ?
+def reuse_previous_state(manager, rcft_path):
     """
+    Mode différentiel : compare le modèle chargé à l'état du point de reprise périmé
+    et reprend les contextes non touchés (voir RCAManager.reuse_from).
+    """
+    previous = load_checkpoint(rcft_path, SCALING_SUPPORT, stale=True)
+    if previous is None: return
+    diffs, dirty = manager.reuse_from(previous)
+    # Point de reprise réécrit avec la signature du nouveau .rcft : même si run() n'a plus rien à
+    # recalculer (donc rien à sauvegarder), la prochaine exécution reprend directement
+    write_checkpoint(manager, rcft_path)
+    kept = [name for name in manager.contexts if name not in dirty]
+    print(f"   > Mode différentiel : {len(dirty)} contexte(s) à recalculer, {len(kept)} repris ({', '.join(sorted(kept)) or 'aucun'})")
+    for name, diff in sorted(diffs.items()):
+        if diff.get('new'):
+            print(f"     [{name}] nouveau contexte")
+            continue
+        print(f"     [{name}] objets +{len(diff['objects_added'])}/-{len(diff['objects_removed'])}, "
+              f"attributs +{len(diff['attributes_added'])}/-{len(diff['attributes_removed'])}, "
+              f"{diff['incidences']} incidence(s) modifiée(s)" + (", ordre des objets modifié" if diff.get('reordered') else ""))
+    if "Classes" in previous.lattice_cache:
+        previous.min_support, previous.min_intent = MIN_SUPPORT, MIN_INTENT
+        _previous_groups[os.path.abspath(rcft_path)] = extract_groups(previous.final_lattice("Classes"))
 
-    payload = {
-        "model": MISTRAL_MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ],
-        "response_format": {"type": "json_object"}, # Force le mode JSON de Mistral
-        "temperature": 0.2
-    }
-
-    # 3. Appel API avec gestion d'erreurs
+def run_rca(rcft_path):
+    """
+    Chargement + boucle RCA d'un fichier. Un fichier inchangé (même taille, même mtime,
+    mêmes réglages) réutilise le résultat précédent : utile en mode worker.
+    Retourne (manager, treillis) ou (None, None) si le fichier est illisible.
+    """
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-
-        if response.status_code == 200:
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            # Nettoyage au cas où le modèle ajoute du markdown ```json ... ```
-            clean_content = content.replace("```json", "").replace("```", "").strip()
-            return json.loads(clean_content)
-        elif response.status_code == 429:
-            print("[IA ERROR] Quota Mistral dépassé (429).")
-            return simulate_response(objects)
-        else:
-            print(f"[IA ERROR] Erreur API Mistral : {response.status_code} - {response.text}")
-            return simulate_response(objects)
-
-    except Exception as e:
-        print(f"[IA CRITICAL] Exception lors de l'appel Mistral : {e}")
-        return simulate_response(objects)
+        st = os.stat(rcft_path)
+        signature = (st.st_size, st.st_mtime_ns, RCA_BACKEND, MIN_SUPPORT, MIN_INTENT, SCALING_SUPPORT)
+    except OSError:
+        signature = None
+    key = os.path.abspath(rcft_path)
+    memo = _rca_memo.get(key)
+    if signature is not None and memo is not None and memo[0] == signature:
+        print(f"--- RCA de {rcft_path} déjà calculée (fichier inchangé), résultat réutilisé ---")
+        return memo[1], memo[2]
 
-# --- 3. EXÉCUTION ---
-
-def run_rca_pipeline():
-    # 1. RCA
-    manager = load_data_from_rcft(RCFT_PATH)
-    if not manager: return
+    # Point de reprise : état de la boucle (voire treillis finaux) d'une exécution précédente interrompue ou terminée
+    manager = load_checkpoint(rcft_path, SCALING_SUPPORT) if USE_CHECKPOINT else None
+    if not manager:
+        manager = load_rcft_cached(rcft_path) if USE_COMPILED_RCFT else load_data_from_rcft(rcft_path)
+        if manager and USE_CHECKPOINT and USE_DIFF:
+            reuse_previous_state(manager, rcft_path)
+    if not manager: return None, None
 
     print("\n--- Lancement RCA (Treillis de Galois) ---")
-    lattices = manager.run(max_steps=10)
+    # Seul le treillis des Classes est exploité : on ne calcule que ce dont il dépend
+    save = (lambda m: write_checkpoint(m, rcft_path)) if USE_CHECKPOINT else None
+    lattices = manager.run(max_steps=10, targets=["Classes"], backend=RCA_BACKEND,
+                           min_support=MIN_SUPPORT, min_intent=MIN_INTENT,
+                           scaling_support=SCALING_SUPPORT, checkpoint=save)
+
+    if signature is not None and RCA_MEMO_MAX:
+        _rca_memo.pop(key, None)
+        _rca_memo[key] = (signature, manager, lattices)
+        while len(_rca_memo) > RCA_MEMO_MAX:
+            del _rca_memo[next(iter(_rca_memo))] # Le plus ancien
+    return manager, lattices
+
+def run_rca_pipeline(rcft_path=RCFT_PATH, output_json=OUTPUT_JSON, skipped_json=None, limiter=None, metrics_file=None):
+    """
+    Pipeline complet sur un fichier RCFT : RCA, classement, IA, écriture du plan JSON.
+    - skipped_json : groupes écartés par le classement, écrit seulement s'il y en a (défaut : SKIPPED_JSON à côté du plan)
+    - limiter : limiteur de débit LLM partagé (ex: entre les processus d'un batch)
+    - metrics_file : export des métriques si RCA_METRICS les active (défaut : le chemin de RCA_METRICS)
+    Retourne un résumé (dict), ou None si le fichier n'a pas pu être chargé.
+    """
+    metrics_path = enable_from_env()
+    if metrics_path and metrics_file:
+        metrics_path = metrics_file
+    metrics = get_metrics()
+    skipped_json = skipped_json or os.path.join(os.path.dirname(output_json), SKIPPED_JSON)
+
+    # 1. RCA
+    manager, lattices = run_rca(rcft_path)
+    if not manager: return None
 
     # 2. Analyse
     improvements = []
-    processed = set()
+    groups = []
+    skipped = []
 
     if "Classes" in lattices:
-        for concept in lattices["Classes"]:
-            objs = sorted(list(concept.extent))
-            attrs = list(concept.intent)
+        groups = extract_groups(lattices["Classes"])
+
+        # Mode différentiel : seuls les groupes nouveaux ou modifiés (extension ou intension) manquent
+        # au cache LLM, les groupes inchangés y retrouvent leur décision sans nouvel appel
+        previous = _previous_groups.pop(os.path.abspath(rcft_path), None)
+        if previous is not None:
+            before = {(tuple(objs), tuple(sorted(attrs))) for objs, attrs in previous}
+            after = {(tuple(objs), tuple(sorted(attrs))) for objs, attrs in groups}
+            print(f"   > Groupes : {len(after & before)} inchangé(s), {len(after - before)} nouveau(x) ou modifié(s), "
+                  f"{len(before - after)} disparu(s)")
 
-            # Filtre : Il faut au moins 2 objets et des attributs communs
-            if len(objs) < 2 or len(attrs) == 0: continue
+        # Classement : seuls les meilleurs groupes (dans le budget) partent vers l'IA
+        max_groups = 0
+        if LLM_TIME_BUDGET and LLM_RATE:
+            max_groups = max(1, int(LLM_TIME_BUDGET * LLM_RATE)) * max(1, LLM_BATCH_SIZE)
+        elif LLM_TIME_BUDGET:
+            print("[WARN] LLM_TIME_BUDGET ignoré : débit illimité (LLM_RATE=0), durée non estimable.")
+        with metrics.phase('ranking'):
+            ranked, skipped = rank_groups(manager.contexts["Classes"], groups, LLM_RANK_BY, LLM_TOP_K,
+                                          LLM_TOKEN_BUDGET, max_groups, LLM_REQUIRE_FEATURES)
+        groups = [group for group, _ in ranked]
+        print(f"\n--- Classement ({LLM_RANK_BY}) : {len(groups)} groupe(s) retenu(s), {len(skipped)} écarté(s) ---")
+        if skipped:
+            with open(skipped_json, 'w', encoding='utf-8') as f:
+                json.dump([{"classes": objs, "attributs": attrs, **scores} for (objs, attrs), scores in skipped],
+                          f, indent=4, ensure_ascii=False)
+            print(f"   > Groupes écartés enregistrés dans {skipped_json}")
 
-            # Évite les doublons
-            if tuple(objs) in processed: continue
-            processed.add(tuple(objs))
+        # Appels à Mistral (ou fallback) en parallèle, par lots ; réponses dans l'ordre des groupes
+        print(f"\n--- Analyse IA de {len(groups)} groupe(s) (concurrence {LLM_CONCURRENCY}, {LLM_RATE} req/s, lots de {LLM_BATCH_SIZE}) ---")
+        with metrics.phase('llm'):
+            responses = ask_mistral_many("Classes", groups, LLM_CONCURRENCY, LLM_RATE, LLM_BURST, LLM_BATCH_SIZE, limiter)
+        metrics.count('llm_groups', len(groups))
 
+        cache = get_cache()
+        if cache is not None:
+            info = cache.stats()
+            print(f"   > Cache LLM : {info['hits']} hits / {info['misses']} misses ({info['hit_rate']:.0%})")
+            metrics.set_counter('llm_cache_hits', info['hits'])
+            metrics.set_counter('llm_cache_misses', info['misses'])
+
+        for (objs, attrs), res in zip(groups, responses):
             print(f"\n[GROUPE IDENTIFIÉ] {objs}")
             print(f"   -> Attributs : {attrs}")
 
-            # Appel à Mistral (ou fallback)
-            res = ask_mistral("Classes", objs, attrs)
-
             if res and res.get('decision') in ["INTERFACE", "HERITAGE"]:
                 print(f"   >>> DÉCISION IA : {res['decision']} {res['nom_suggere']}")
                 improvements.append({
@@ -207,9 +219,101 @@ def run_rca_pipeline():
                  print("   >>> DÉCISION IA : Pas de refactoring.")
 
     # 3. Écriture JSON
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
+    with open(output_json, 'w', encoding='utf-8') as f:
         json.dump(improvements, f, indent=4, ensure_ascii=False)
-    print(f"\n[FIN] Fichier {OUTPUT_JSON} généré avec {len(improvements)} propositions.")
+    print(f"\n[FIN] Fichier {output_json} généré avec {len(improvements)} propositions.")
+
+    if metrics_path:
+        metrics.export(metrics_path)
+        print(f"[METRICS] Métriques écrites dans {metrics_path}")
+
+    return {"output": output_json, "groups": len(groups), "skipped": len(skipped), "improvements": len(improvements)}
+
+# --- 4. MODE WORKER (PROCESSUS LONGUE DURÉE) ---
+# Une requête JSON par ligne, une réponse JSON par ligne :
+#   {"id": 1, "cmd": "analyze", "rcft": "sortie.rcft", "output": "plan_amelioration.json"}
+#   -> {"id": 1, "ok": true, "result": {"output": ..., "groups": ..., "skipped": ..., "improvements": ...}}
+#   {"id": 2, "cmd": "ping"} / {"cmd": "stats"} / {"cmd": "shutdown"}
+#   -> {"id": 2, "ok": false, "error": "..."} en cas d'échec
+# Les bibliothèques, le cache LLM et les résultats RCA restent chargés entre deux jobs.
+# Les journaux (print) partent sur stderr : stdout ne transporte que le protocole.
+
+_worker_jobs = 0
+
+def handle_request(request):
+    """Exécute une requête du protocole worker ; retourne (réponse, continuer)"""
+    global _worker_jobs
+    cmd = request.get("cmd")
+    response = {"id": request.get("id"), "ok": True}
+
+    if cmd == "ping":
+        response["result"] = "pong"
+    elif cmd == "analyze":
+        result = run_rca_pipeline(request.get("rcft", RCFT_PATH), request.get("output", OUTPUT_JSON))
+        _worker_jobs += 1
+        if result is None:
+            return {"id": request.get("id"), "ok": False, "error": f"Fichier {request.get('rcft', RCFT_PATH)} illisible"}, True
+        response["result"] = result
+    elif cmd == "stats":
+        cache = get_cache()
+        response["result"] = {
+            "jobs": _worker_jobs,
+            "rca_memo": len(_rca_memo),
+            "llm_cache": cache.stats() if cache is not None else None,
+            "metrics": get_metrics().to_dict() if get_metrics().enabled else None,
+        }
+    elif cmd == "shutdown":
+        response["result"] = "bye"
+        return response, False
+    else:
+        return {"id": request.get("id"), "ok": False, "error": f"Commande inconnue : {cmd}"}, True
+    return response, True
+
+def serve(reader, writer):
+    """Boucle du worker sur un flux texte de requêtes ; retourne False après 'shutdown'"""
+    for line in reader:
+        line = line.strip()
+        if not line: continue
+        request = None
+        try:
+            request = json.loads(line)
+            with contextlib.redirect_stdout(sys.stderr):
+                response, keep_going = handle_request(request)
+        except Exception as e:
+            # L'id est renvoyé dès que la requête a pu être lue : le client associe l'erreur à sa requête
+            request_id = request.get("id") if isinstance(request, dict) else None
+            response, keep_going = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}, True
+        writer.write(json.dumps(response, ensure_ascii=False) + "\n")
+        writer.flush()
+        if not keep_going:
+            return False
+    return True
+
+def serve_socket(port, host="127.0.0.1"):
+    """Même protocole sur une socket TCP locale (une connexion à la fois)"""
+    state = {"running": True}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            reader = io.TextIOWrapper(self.rfile, encoding='utf-8')
+            writer = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+            state["running"] = serve(reader, writer)
+
+    with socketserver.TCPServer((host, port), Handler) as server:
+        print(f"[WORKER] En écoute sur {host}:{port}", file=sys.stderr)
+        while state["running"]:
+            server.handle_request()
 
 if __name__ == "__main__":
-    run_rca_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pipeline RCA + IA sur un fichier RCFT.")
+    parser.add_argument("--worker", action="store_true", help="Processus longue durée : jobs JSON sur stdin/stdout")
+    parser.add_argument("--socket", type=int, metavar="PORT", help="Avec --worker : écoute sur 127.0.0.1:PORT au lieu de stdin")
+    args = parser.parse_args()
+
+    if not args.worker:
+        run_rca_pipeline()
+    elif args.socket:
+        serve_socket(args.socket)
+    else:
+        print("[WORKER] Prêt (jobs JSON sur stdin).", file=sys.stderr)
+        serve(sys.stdin, sys.stdout)
\ No newline at end of file
@@ -1,98 +1,452 @@
-from concepts import Context
+import time
+
+from bit_context import BitContext, SparseRelation, columns_from_matrix, existential_columns, popcount
+from lattice_backends import get_backend
+from metrics import get_metrics
+from stability import DEFAULT_CONFIDENCE, DEFAULT_SAMPLES, lattice_stability
+
+REL_PREFIX = "rel_" # Attributs relationnels ajoutés par le scaling (ex: "rel_Types[public,static]")
+
+def context_diff(old, new):
+    """
+    Différences entre deux versions d'un contexte (les attributs relationnels de old sont ignorés).
+    Retourne None si le contenu est identique, sinon un dict : objets / attributs ajoutés et retirés,
+    nb de cellules modifiées parmi les objets et attributs communs ('incidences'), et 'reordered'
+    si seul l'ordre des objets a changé (les bitsets ne sont alors plus comparables tels quels).
+    """
+    old_attrs = {p: j for p, j in old.property_index.items() if not p.startswith(REL_PREFIX)}
+    new_attrs = new.property_index
+    old_objs = old.object_index
+    same_objects = old.objects == new.objects
+
+    incidences = 0
+    for name, j in new_attrs.items():
+        k = old_attrs.get(name)
+        if k is None: continue
+        if same_objects:
+            incidences += popcount(old.columns[k] ^ new.columns[j])
+            continue
+        for i, obj in enumerate(new.objects):
+            o = old_objs.get(obj)
+            if o is not None and (old.columns[k] >> o & 1) != (new.columns[j] >> i & 1):
+                incidences += 1
+
+    diff = {
+        'objects_added': [o for o in new.objects if o not in old_objs],
+        'objects_removed': sorted(set(old.objects) - set(new.objects)),
+        'attributes_added': [p for p in new.properties if p not in old_attrs],
+        'attributes_removed': [p for p in old_attrs if p not in new_attrs],
+        'incidences': incidences,
+    }
+    if not any(diff.values()):
+        if same_objects:
+            return None
+        diff['reordered'] = True
+    return diff
+
+def _relation_columns(rel):
+    """Colonnes bitsets d'une relation, quel que soit son stockage (dense ou CSR)"""
+    return rel['columns'] if rel.get('csr') is None else rel['csr'].to_columns()
+
+def strongly_connected_components(nodes, edges):
+    """
+    Composantes fortement connexes (Tarjan, version itérative).
+    edges[n] = successeurs de n. Une composante est émise après toutes celles
+    qu'elle atteint : avec des arcs source -> cible, les cibles sortent en premier.
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index: continue
+        work = [(root, iter(edges.get(root, ())))]
+        index[root] = low[root] = counter; counter += 1
+        stack.append(root); on_stack.add(root)
+        while work:
+            node, succs = work[-1]
+            advanced = False
+            for succ in succs:
+                if succ not in index:
+                    index[succ] = low[succ] = counter; counter += 1
+                    stack.append(succ); on_stack.add(succ)
+                    work.append((succ, iter(edges.get(succ, ()))))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            if advanced: continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop(); on_stack.discard(member)
+                    component.append(member)
+                    if member == node: break
+                components.append(component)
+
+    return components
 
 class RCAManager:
-    def __init__(self):
+    def __init__(self, backend='incremental', min_support=0, min_intent=0, scaling_support=0):
         self.contexts = {}
         self.relations = []
+        self.backend = get_backend(backend) # 'incremental', 'fcbo', 'fcbo-parallel' ou 'concepts'
+        # Mode iceberg : treillis finaux sans les concepts de moins de min_support objets / min_intent attributs
+        self.min_support = min_support
+        self.min_intent = min_intent
+        # Le scaling utilise les treillis complets ; scaling_support > 0 y élague aussi les petites
+        # extensions (plus rapide, mais les attributs relationnels correspondants sont perdus)
+        self.scaling_support = scaling_support
+        self.lattice_cache = {}        # Nom du contexte -> ((version du contexte, scaling_support), concepts)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.iteration_stats = []      # Travail effectué à chaque itération de run()
 
     def add_context(self, name, objects, properties, matrix):
         """Ajoute un contexte (ex: Classes ou Types)"""
-        # On stocke les données brutes pour pouvoir les modifier (ajouter des colonnes)
-        self.contexts[name] = {
-            'objects': objects,
-            'properties': properties, # Liste de strings
-            'matrix': matrix          # Liste de listes de booléens
-        }
+        # Stockage compact en bitsets : une colonne = un entier, ajout de colonne bon marché
+        self.add_bit_context(name, BitContext.from_matrix(objects, properties, matrix))
+
+    def add_bit_context(self, name, ctx):
+        """Ajoute un contexte déjà construit en BitContext (ex: par le lecteur RCFT)"""
+        self.contexts[name] = ctx
 
-    def add_relation(self, source_name, target_name, relation_matrix):
-        """Ajoute une relation (ex: Classes --appelle--> Methodes)"""
+    def add_relation(self, source_name, target_name, relation_matrix, sparse=False):
+        """
+        Ajoute une relation (ex: Classes --appelle--> Methodes).
+        sparse=True : stockage CSR (adapté aux relations très creuses, ex: dependencies).
+        """
+        width = len(relation_matrix[0]) if relation_matrix else 0
+        if sparse:
+            self.add_sparse_relation(source_name, target_name, SparseRelation.from_matrix(relation_matrix, width))
+        else:
+            self.add_relation_columns(source_name, target_name, columns_from_matrix(relation_matrix, width),
+                                      n_sources=len(relation_matrix))
+
+    def add_sparse_relation(self, source_name, target_name, csr, name=None):
+        """Ajoute une relation creuse (SparseRelation, CSR) : chargement et scaling en O(nnz)"""
+        self.relations.append({
+            'name': name,
+            'source': source_name,
+            'target': target_name,
+            'csr': csr,
+            'target_version': None
+        })
+
+    def add_relation_columns(self, source_name, target_name, columns, name=None, n_sources=None):
+        """
+        Ajoute une relation stockée par colonnes : columns[j] = bitset des objets source liés à l'objet cible j.
+        n_sources : nb de lignes de la relation (par défaut, déduit du bit le plus haut des colonnes).
+        """
+        if n_sources is None:
+            n_sources = max((col.bit_length() for col in columns), default=0)
         self.relations.append({
+            'name': name,
             'source': source_name,
             'target': target_name,
-            'matrix': relation_matrix
+            'columns': columns,
+            'n_sources': n_sources,
+            'target_version': None # Version de la cible lors de la dernière évaluation
         })
 
     def get_lattice(self, name):
-        """Génère le treillis actuel pour un contexte"""
+        """Génère le treillis actuel pour un contexte (mis en cache par version du contexte)"""
         data = self.contexts[name]
+        key = (data.version, self.scaling_support)
+        cached = self.lattice_cache.get(name)
+        if cached is not None and cached[0] == key:
+            self.cache_hits += 1
+            get_metrics().count('lattice_cache_hits')
+            return cached[1]
+        self.cache_misses += 1
+        get_metrics().count('lattice_cache_misses')
+        concepts = self._build_lattice(name)
+        self.lattice_cache[name] = (key, concepts)
+        return concepts
+
+    def _build_lattice(self, name):
+        """
+        Calcule le treillis via le backend choisi, sans passer par le cache.
+        Une erreur du backend est propagée : un treillis vide n'est jamais mis en cache
+        (ni repris) à la place d'un calcul qui a échoué.
+        """
+        data = self.contexts[name]
+        metrics = get_metrics()
         try:
-            return Context(data['objects'], data['properties'], data['matrix']).lattice
+            with metrics.phase('lattice'):
+                concepts = self.backend.concepts(data, self.scaling_support)
+            metrics.count('concepts_enumerated', len(concepts))
+            return concepts
         except Exception as e:
             print(f"Erreur création treillis {name}: {e}")
-            return []
+            raise
+
+    def final_lattice(self, name):
+        """Treillis d'un contexte restreint aux seuils iceberg (min_support / min_intent)"""
+        concepts = self.get_lattice(name)
+        if not self.min_support and not self.min_intent:
+            return concepts
+        ctx = self.contexts[name]
+        result = []
+        for c in concepts:
+            if popcount(self._extent_bits(c, ctx)) < self.min_support: continue
+            intent = getattr(c, 'intent_bits', None)
+            if (popcount(intent) if intent is not None else len(c.intent)) < self.min_intent: continue
+            result.append(c)
+        return result
+
+    def cache_info(self):
+        """Statistiques du cache de treillis"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total else 0.0
+        }
 
-    def _scaling_step(self):
-        """Une étape de mise à l'échelle relationnelle (Scaling)"""
+    def stability(self, name, concepts=None, samples=DEFAULT_SAMPLES, confidence=DEFAULT_CONFIDENCE):
+        """
+        Stabilité des concepts d'un contexte (par défaut ceux de son treillis final),
+        exacte pour les petites extensions, estimée avec intervalle de confiance sinon (voir stability.py)
+        """
+        concepts = self.final_lattice(name) if concepts is None else concepts
+        return lattice_stability(self.contexts[name], concepts, samples, confidence)
+
+    @staticmethod
+    def _extent_bits(concept, ctx):
+        """Extension d'un concept sous forme de bitset sur les objets du contexte"""
+        bits = getattr(concept, 'extent_bits', None)
+        if bits is None:
+            # Concept issu de la lib concepts : on repasse par les noms
+            bits = ctx.object_bits(concept.extent)
+        return bits
+
+    def _scaling_step(self, relations=None):
+        """Une étape de mise à l'échelle relationnelle (Scaling) sur les relations données"""
         changes = 0
+        metrics = get_metrics()
 
-        for rel in self.relations:
+        for rel in (self.relations if relations is None else relations):
             src_name = rel['source']
             tgt_name = rel['target']
-            rel_mat = rel['matrix']
 
             # 1. On récupère le treillis de la cible pour voir les concepts émergents
             tgt_lattice = self.get_lattice(tgt_name)
             src_data = self.contexts[src_name]
             tgt_data = self.contexts[tgt_name]
+            rel['target_version'] = tgt_data.version
+
+            # 2-3. Chronométré à part : le calcul du treillis cible relève de la phase 'lattice'
+            with metrics.phase('scaling'):
+                # 2. Pour chaque concept cible, on prépare un attribut potentiel dans la source
+                #    (en mode iceberg, le treillis ne contient déjà que les concepts assez fréquents)
+                names = []
+                extents = []
+                for concept in tgt_lattice:
+                    extent = self._extent_bits(concept, tgt_data)
+                    if not extent: continue # On ignore le concept vide
+
+                    # Signature du concept cible (ex: "public,static")
+                    concept_intent = ",".join(sorted(concept.intent))
+                    if not concept_intent: concept_intent = "Empty"
+
+                    # Nom technique de l'attribut relationnel
+                    # Ex: "rel_Types[public,static]"
+                    new_attr_name = f"{REL_PREFIX}{tgt_name}[{concept_intent}]"
 
-            # 2. Pour chaque concept cible, on crée un attribut potentiel dans la source
-            for concept in tgt_lattice:
-                if not concept.extent: continue # On ignore le concept vide
-
-                # Signature du concept cible (ex: "public,static")
-                concept_intent = ",".join(sorted(concept.intent))
-                if not concept_intent: concept_intent = "Empty"
-
-                # Nom technique de l'attribut relationnel
-                # Ex: "rel_Types[public,static]"
-                new_attr_name = f"rel_{tgt_name}[{concept_intent}]"
-
-                if new_attr_name in src_data['properties']:
-                    continue # Déjà existant
-
-                # 3. On calcule quels objets source sont liés à ce concept cible
-                new_col = []
-                target_extent = concept.extent # Les objets de la cible qui forment ce concept
-
-                for i, src_obj in enumerate(src_data['objects']):
-                    # Est-ce que src_obj est lié à AU MOINS UN objet du target_extent ?
-                    is_linked = False
-                    for j, is_related in enumerate(rel_mat[i]):
-                        if is_related:
-                            target_obj_name = tgt_data['objects'][j]
-                            if target_obj_name in target_extent:
-                                is_linked = True
-                                break
-                    new_col.append(is_linked)
-
-                # Si au moins un objet source a cette relation, on ajoute la colonne
-                if any(new_col):
-                    src_data['properties'].append(new_attr_name)
-                    for idx, val in enumerate(new_col):
-                        src_data['matrix'][idx].append(val)
-                    changes += 1
+                    if src_data.has_property(new_attr_name):
+                        continue # Déjà existant
 
+                    names.append(new_attr_name)
+                    extents.append(extent)
+
+                # 3. Un seul produit booléen relation × extensions donne toutes les colonnes candidates
+                if rel.get('csr') is not None:
+                    new_cols = rel['csr'].existential_columns(extents)
+                else:
+                    new_cols = existential_columns(rel['columns'], extents)
+                for new_attr_name, new_col in zip(names, new_cols):
+                    # Si au moins un objet source a cette relation, on ajoute la colonne
+                    if new_col:
+                        src_data.add_column(new_attr_name, new_col)
+                        changes += 1
+
+        metrics.count('relational_columns_added', changes)
         return changes
 
-    def run(self, max_steps=10):
-        """Exécute la boucle RCA jusqu'à stabilité"""
-        print(f"--- Démarrage RCA ({len(self.contexts)} contextes, {len(self.relations)} relations) ---")
-        for i in range(max_steps):
-            print(f"   > Itération {i+1}...")
-            changes = self._scaling_step()
-            if changes == 0:
-                print("   > Convergence atteinte (Stable).")
-                break
-
-        # Retourne tous les treillis finaux
-        return {name: self.get_lattice(name) for name in self.contexts}
\ No newline at end of file
+    def reuse_from(self, previous):
+        """
+        Mode différentiel : self vient d'être chargé (contextes de base), previous est l'état RCA
+        d'une version précédente du même modèle (ex: point de reprise périmé, voir rcft_binary).
+        Les contextes que le changement n'atteint pas (ni modifiés, ni dépendants d'un contexte
+        ou d'une relation modifiés) sont repris tels quels : colonnes relationnelles, treillis en cache
+        et relations propres. Les autres repartent de leur contexte de base au prochain run().
+        Retourne (différences par contexte, ensemble des contextes à recalculer).
+        """
+        diffs = {}
+        dirty = set()
+        for name, ctx in self.contexts.items():
+            old = previous.contexts.get(name)
+            diff = context_diff(old, ctx) if old is not None else {'new': True}
+            if diff:
+                diffs[name] = diff
+                dirty.add(name)
+
+        # Relations appariées par (nom, source, cible, rang) ; ajoutées, retirées ou modifiées -> source à recalculer
+        def keyed(relations):
+            seen = {}
+            result = {}
+            for rel in relations:
+                key = (rel.get('name'), rel['source'], rel['target'])
+                seen[key] = seen.get(key, 0) + 1
+                result[key + (seen[key],)] = rel
+            return result
+        old_rels = keyed(previous.relations)
+        new_rels = keyed(self.relations)
+        for key, rel in new_rels.items():
+            old = old_rels.get(key)
+            if old is None or _relation_columns(old) != _relation_columns(rel):
+                dirty.add(rel['source'])
+        for key, rel in old_rels.items():
+            if key not in new_rels and rel['source'] in self.contexts:
+                dirty.add(rel['source'])
+
+        # Propagation : une source dépend du treillis de sa cible
+        sources = {}
+        for rel in self.relations:
+            sources.setdefault(rel['target'], []).append(rel['source'])
+        todo = list(dirty)
+        while todo:
+            for src in sources.get(todo.pop(), ()):
+                if src not in dirty:
+                    dirty.add(src)
+                    todo.append(src)
+
+        # Les colonnes relationnelles et treillis repris ne valent que pour le scaling_support de previous
+        self.scaling_support = previous.scaling_support
+        for name in self.contexts:
+            if name in dirty: continue
+            self.contexts[name] = previous.contexts[name]
+            if name in previous.lattice_cache:
+                self.lattice_cache[name] = previous.lattice_cache[name]
+        for key, rel in new_rels.items():
+            if rel['source'] not in dirty:
+                rel['target_version'] = old_rels[key]['target_version']
+        return diffs, dirty
+
+    def _dependency_edges(self):
+        """Graphe de dépendance : source -> [cibles] (la source dépend du treillis de la cible)"""
+        edges = {}
+        for rel in self.relations:
+            edges.setdefault(rel['source'], []).append(rel['target'])
+        return edges
+
+    def _required_contexts(self, targets):
+        """Contextes nécessaires pour calculer les cibles : elles-mêmes + tout ce qu'elles atteignent"""
+        edges = self._dependency_edges()
+        required = set()
+        todo = list(targets)
+        while todo:
+            name = todo.pop()
+            if name in required: continue
+            required.add(name)
+            todo.extend(edges.get(name, ()))
+        return required
+
+    def _schedule(self, required=None):
+        """
+        Ordre de traitement : composantes fortement connexes du graphe source -> cible,
+        les contextes cibles d'abord. Retourne [(composante, relations entrantes, cyclique)].
+        Si required est donné, seuls ces contextes sont planifiés.
+        """
+        edges = self._dependency_edges()
+        nodes = [name for name in self.contexts if required is None or name in required]
+
+        plan = []
+        for component in strongly_connected_components(nodes, edges):
+            members = set(component)
+            rels = [rel for rel in self.relations if rel['source'] in members]
+            if not rels: continue
+            cyclic = any(rel['target'] in members for rel in rels)
+            plan.append((component, rels, cyclic))
+        return plan
+
+    def run(self, max_steps=10, targets=None, backend=None, min_support=None, min_intent=None,
+            scaling_support=None, checkpoint=None):
+        """
+        Exécute la boucle RCA jusqu'à stabilité (semi-naïf).
+        - Les parties acycliques sont mises à l'échelle une seule fois, cibles d'abord.
+        - Dans un cycle, on ne réévalue que les relations dont la cible a changé.
+        - targets (ex: ["Classes"]) : on ne calcule que ces treillis et ce dont ils dépendent.
+        - backend : moteur de treillis pour cette exécution (sinon celui du constructeur).
+        - min_support / min_intent : seuils du mode iceberg, appliqués aux treillis renvoyés.
+        - scaling_support : extension minimale des concepts cibles du scaling (0 = treillis complets).
+        - checkpoint : fonction appelée avec le manager après chaque itération et une fois les
+          treillis finaux calculés (ex: rcft_binary.write_checkpoint). Un manager restauré reprend
+          là où il s'était arrêté : les relations déjà propres ne sont pas réévaluées.
+        """
+        if backend is not None:
+            self.backend = get_backend(backend)
+        if min_support is not None:
+            self.min_support = min_support
+        if min_intent is not None:
+            self.min_intent = min_intent
+        if scaling_support is not None:
+            self.scaling_support = scaling_support
+        if self.min_support or self.min_intent:
+            print(f"   > Mode iceberg : extension >= {self.min_support}, intension >= {self.min_intent}")
+        if self.scaling_support:
+            print(f"   > Scaling élagué : extension >= {self.scaling_support}")
+        print(f"--- Démarrage RCA ({len(self.contexts)} contextes, {len(self.relations)} relations, backend {self.backend.name}) ---")
+        self.iteration_stats = []
+        misses = self.cache_misses
+
+        required = None
+        if targets is not None:
+            unknown = [name for name in targets if name not in self.contexts]
+            for name in unknown:
+                print(f"   [WARN] Contexte cible '{name}' inconnu, ignoré.")
+            targets = [name for name in targets if name in self.contexts]
+            required = self._required_contexts(targets)
+            print(f"   > Contextes nécessaires : {', '.join(sorted(required))}")
+
+        for component, rels, cyclic in self._schedule(required):
+            label = ",".join(sorted(component))
+            for i in range(max_steps if cyclic else 1):
+                start = time.perf_counter()
+                evaluated = 0
+                changes = 0
+                for rel in rels:
+                    # Relation "propre" : cible inchangée depuis sa dernière évaluation -> rien à ajouter
+                    if rel['target_version'] == self.contexts[rel['target']].version: continue
+                    changes += self._scaling_step([rel])
+                    evaluated += 1
+                if not evaluated:
+                    print(f"   > [{label}] Convergence atteinte (Stable).")
+                    break
+                get_metrics().count('iterations')
+                self.iteration_stats.append({
+                    'contexts': sorted(component),
+                    'iteration': i + 1,
+                    'relations': evaluated,
+                    'columns_added': changes,
+                    'seconds': time.perf_counter() - start
+                })
+                print(f"   > [{label}] Itération {i+1} : {evaluated} relation(s), {changes} colonne(s) ajoutée(s)")
+                if checkpoint is not None:
+                    checkpoint(self)
+
+        # Retourne les treillis finaux (tous, ou seulement ceux demandés)
+        lattices = {name: self.final_lattice(name) for name in (self.contexts if targets is None else targets)}
+        if checkpoint is not None and (self.iteration_stats or self.cache_misses != misses):
+            checkpoint(self) # Treillis finaux inclus : une reprise n'a plus rien à calculer
+        info = self.cache_info()
+        print(f"   > Cache treillis : {info['hits']} hits / {info['misses']} misses ({info['hit_rate']:.0%})")
+        return lattices
@@ -0,0 +1,305 @@
+"""
+Format RCFT compilé (.rcftb) : compagnon binaire d'un fichier .rcft.
+
+Disposition du fichier :
+    MAGIC (6 octets) | taille de l'en-tête (uint32 LE) | en-tête JSON (utf-8) | matrices
+L'en-tête contient les tables de noms (objets, attributs, relations), la signature
+du .rcft source (taille + mtime) et, pour chaque matrice, son offset et son pas.
+Les matrices sont stockées colonne par colonne, chaque colonne étant un bitset
+de `stride` octets (little-endian, bit i = objet i), ainsi que ligne par ligne pour
+les contextes : le chargement n'a ni texte à analyser ni transposition à faire.
+Les relations creuses (CSR) sont stockées sous forme de deux tableaux int64 (indptr, indices).
+
+Le même format sert de point de reprise de la boucle RCA (.ckpt, voir write_checkpoint) :
+l'en-tête porte alors en plus l'état du point fixe (versions des contextes et des relations,
+seuils, statistiques d'itération) et les treillis en cache, stockés en bitsets
+(extension puis intension de chaque concept).
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from bit_context import BitContext, SparseRelation
+from incremental_lattice import Concept
+from metrics import get_metrics
+from rca_engine import RCAManager
+from rcft_reader import load_data_from_rcft
+
+MAGIC = b"RCFTB\x01"
+CHECKPOINT_VERSION = 2 # Format de l'état RCA des points de reprise (load_checkpoint ignore les autres)
+_HEADER_LEN = struct.Struct("<I")
+
+
+def _stride(n_bits):
+    return (n_bits + 7) // 8
+
+
+def _source_signature(rcft_path):
+    st = os.stat(rcft_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def compiled_path(rcft_path):
+    """Chemin du compagnon binaire : sortie.rcft -> sortie.rcftb"""
+    return rcft_path + "b"
+
+
+def _concept_bits(concept, ctx):
+    """(extension, intension) d'un concept en bitsets, quel que soit le backend qui l'a produit"""
+    extent = RCAManager._extent_bits(concept, ctx)
+    intent = getattr(concept, 'intent_bits', None)
+    if intent is None:
+        intent = ctx.property_bits(concept.intent)
+    return extent, intent
+
+
+def write_compiled(manager, out_path, source=None, state=False):
+    """
+    Écrit les contextes et relations d'un RCAManager au format binaire.
+    state=True : ajoute l'état de la boucle RCA et les treillis en cache (point de reprise).
+    """
+    header = {'source': source, 'contexts': [], 'relations': []}
+    chunks = []
+    offset = 0
+
+    def add_bitsets(bitsets, stride):
+        nonlocal offset
+        start = offset
+        for bits in bitsets:
+            chunks.append(bits.to_bytes(stride, 'little'))
+        offset += stride * len(bitsets)
+        return start
+
+    for name, ctx in manager.contexts.items():
+        col_stride = _stride(len(ctx.objects))
+        row_stride = _stride(len(ctx.properties))
+        header['contexts'].append({
+            'name': name,
+            'objects': ctx.objects,
+            'properties': ctx.properties,
+            'columns': add_bitsets(ctx.columns, col_stride),
+            'rows': add_bitsets(ctx.rows, row_stride),
+        })
+        if state:
+            header['contexts'][-1]['version'] = ctx.version
+            cached = manager.lattice_cache.get(name)
+            if cached is not None:
+                key, concepts = cached
+                pairs = [_concept_bits(c, ctx) for c in concepts]
+                header['contexts'][-1]['lattice'] = {
+                    'key': list(key),
+                    'count': len(pairs),
+                    'extents': add_bitsets([e for e, _ in pairs], col_stride),
+                    'intents': add_bitsets([i for _, i in pairs], row_stride),
+                }
+
+    def add_array(values):
+        nonlocal offset
+        start = offset
+        raw = array('q', values).tobytes()
+        chunks.append(raw)
+        offset += len(raw)
+        return start
+
+    if state:
+        header['state'] = {
+            'version': CHECKPOINT_VERSION,
+            'min_support': manager.min_support,
+            'min_intent': manager.min_intent,
+            'scaling_support': manager.scaling_support,
+            'iteration_stats': manager.iteration_stats,
+            'target_versions': [rel['target_version'] for rel in manager.relations],
+        }
+
+    for rel in manager.relations:
+        csr = rel.get('csr')
+        if csr is not None:
+            header['relations'].append({
+                'name': rel.get('name'),
+                'source': rel['source'],
+                'target': rel['target'],
+                'format': 'csr',
+                'n_sources': csr.n_sources,
+                'n_targets': csr.n_targets,
+                'nnz': csr.nnz,
+                'indptr': add_array(csr.indptr),
+                'indices': add_array(csr.indices),
+            })
+            continue
+        n_sources = rel['n_sources'] # Lignes de la relation elle-même (pas forcément celles du contexte source)
+        header['relations'].append({
+            'name': rel.get('name'),
+            'source': rel['source'],
+            'target': rel['target'],
+            'n_sources': n_sources,
+            'n_targets': len(rel['columns']),
+            'columns': add_bitsets(rel['columns'], _stride(n_sources)),
+        })
+
+    raw_header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(raw_header)))
+        f.write(raw_header)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, out_path) # Jamais de fichier à moitié écrit
+
+
+def _read_header(buf):
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError("Fichier RCFT compilé invalide (signature)")
+    (size,) = _HEADER_LEN.unpack_from(buf, len(MAGIC))
+    start = len(MAGIC) + _HEADER_LEN.size
+    return json.loads(bytes(buf[start:start + size]).decode('utf-8')), start + size
+
+
+def read_source_signature(path):
+    """Signature du .rcft ayant servi à compiler le fichier (None si illisible)"""
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _read_header(buf)[0].get('source')
+    except (OSError, ValueError):
+        return None
+
+
+def load_compiled(path, manager=None):
+    """Charge un .rcftb (projeté en mémoire) dans un RCAManager"""
+    rca = manager if manager is not None else RCAManager()
+    with get_metrics().phase('parse_binary'), open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            header, data_start = _read_header(buf)
+            view = memoryview(buf)
+            try:
+                def read_bitsets(offset, count, stride):
+                    base = data_start + offset
+                    return [int.from_bytes(view[base + k * stride:base + (k + 1) * stride], 'little')
+                            for k in range(count)]
+
+                for c in header['contexts']:
+                    columns = read_bitsets(c['columns'], len(c['properties']), _stride(len(c['objects'])))
+                    rows = read_bitsets(c['rows'], len(c['objects']), _stride(len(c['properties'])))
+                    ctx = BitContext.from_bitsets(c['objects'], c['properties'], columns, rows)
+                    rca.add_bit_context(c['name'], ctx)
+                    if 'version' in c:
+                        ctx.version = c['version']
+                    lattice = c.get('lattice')
+                    if lattice is not None:
+                        extents = read_bitsets(lattice['extents'], lattice['count'], _stride(len(c['objects'])))
+                        intents = read_bitsets(lattice['intents'], lattice['count'], _stride(len(c['properties'])))
+                        concepts = [Concept(ctx, e, i) for e, i in zip(extents, intents)]
+                        rca.lattice_cache[c['name']] = (tuple(lattice['key']), concepts)
+
+                def read_array(offset, count):
+                    base = data_start + offset
+                    values = array('q')
+                    values.frombytes(view[base:base + 8 * count])
+                    return values
+
+                for r in header['relations']:
+                    if r.get('format') == 'csr':
+                        csr = SparseRelation(r['n_sources'], r['n_targets'],
+                                             read_array(r['indptr'], r['n_sources'] + 1),
+                                             read_array(r['indices'], r['nnz']))
+                        rca.add_sparse_relation(r['source'], r['target'], csr, name=r['name'])
+                        continue
+                    columns = read_bitsets(r['columns'], r['n_targets'], _stride(r['n_sources']))
+                    rca.add_relation_columns(r['source'], r['target'], columns, name=r['name'], n_sources=r['n_sources'])
+            finally:
+                view.release()
+
+    state = header.get('state')
+    if state is not None:
+        # Reprise : relations propres (cible inchangée) et seuils tels qu'au moment de la sauvegarde
+        rca.min_support = state['min_support']
+        rca.min_intent = state['min_intent']
+        rca.scaling_support = state['scaling_support']
+        rca.iteration_stats = state['iteration_stats']
+        for rel, version in zip(rca.relations, state['target_versions']):
+            rel['target_version'] = version
+    return rca
+
+
+def compile_rcft(rcft_path, out_path=None):
+    """Analyse le .rcft texte et écrit son compagnon binaire. Retourne le RCAManager chargé."""
+    out_path = out_path or compiled_path(rcft_path)
+    manager = load_data_from_rcft(rcft_path)
+    if manager is None:
+        return None
+    write_compiled(manager, out_path, source=_source_signature(rcft_path))
+    print(f" [RCFTB] Fichier compilé écrit : {out_path}")
+    return manager
+
+
+def load_rcft_cached(rcft_path):
+    """
+    Charge un RCFT en passant par son compagnon binaire :
+    - à jour (même taille et même mtime que le .rcft) -> chargement mmap, sans analyse du texte ;
+    - absent ou périmé -> analyse du texte puis (re)compilation.
+    """
+    out_path = compiled_path(rcft_path)
+    try:
+        source = _source_signature(rcft_path)
+    except FileNotFoundError:
+        print(f"[ERREUR] Fichier {rcft_path} introuvable.")
+        return None
+
+    if os.path.exists(out_path) and read_source_signature(out_path) == source:
+        print(f"--- Lecture du fichier compilé {out_path} ---")
+        return load_compiled(out_path)
+
+    return compile_rcft(rcft_path, out_path)
+
+
+# --- Points de reprise de la boucle RCA ---
+
+def checkpoint_path(rcft_path):
+    """Chemin du point de reprise : sortie.rcft -> sortie.rcft.ckpt"""
+    return rcft_path + ".ckpt"
+
+
+def write_checkpoint(manager, rcft_path):
+    """
+    Sauvegarde l'état de la boucle RCA (contextes mis à l'échelle, versions, treillis en cache).
+    Prévu pour RCAManager.run(checkpoint=...) ; un échec d'écriture n'interrompt pas la RCA.
+    """
+    try:
+        write_compiled(manager, checkpoint_path(rcft_path), source=_source_signature(rcft_path), state=True)
+    except OSError as e:
+        print(f"   [WARN] Point de reprise non écrit : {e}")
+
+
+def load_checkpoint(rcft_path, scaling_support=0, stale=False):
+    """
+    RCAManager restauré depuis le point de reprise du .rcft, ou None s'il est absent,
+    périmé (.rcft modifié depuis) ou mis à l'échelle avec un autre scaling_support.
+    Les seuils iceberg (min_support / min_intent) ne filtrent que les treillis finaux :
+    ceux passés à run() s'appliquent après la reprise.
+    Une boucle terminée reprend sans aucune itération : run() renvoie directement les treillis en cache.
+    stale=True : accepte un point de reprise périmé, comme état précédent du mode différentiel
+    (voir RCAManager.reuse_from).
+    """
+    path = checkpoint_path(rcft_path)
+    try:
+        source = _source_signature(rcft_path)
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                header = _read_header(buf)[0]
+    except (OSError, ValueError):
+        return None
+    state = header.get('state')
+    if (header.get('source') != source and not stale) or state is None:
+        return None
+    if state.get('version') != CHECKPOINT_VERSION:
+        return None
+    if state['scaling_support'] != scaling_support:
+        return None
+    if header.get('source') != source:
+        print(f"--- État RCA précédent chargé depuis {path} (modèle modifié depuis) ---")
+    else:
+        print(f"--- Reprise depuis le point de sauvegarde {path} ---")
+    return load_compiled(path)
@@ -0,0 +1,87 @@
+"""
+Générateur de fichiers RCFT synthétiques (charges de test pour les benchmarks).
+
+Contextes C0..Ck-1 (objets Ci_o<n>, attributs Ci_a<n>) remplis avec une densité donnée,
+puis des relations R0..Rr-1 : Rr va de C(r mod k) vers C(r+1 mod k), ce qui donne une
+chaîne tant que r < k et des cycles au-delà. Chaque objet source est lié à `fanout`
+objets cibles distincts tirés au hasard. Même graine -> même fichier.
+
+Usage : python rcft_generator.py sortie_synth.rcft --objects 1000 --attributes 50 --density 0.1
+"""
+import argparse
+import random
+
+
+def _write_table(f, objects, columns, rows, sparse):
+    """Écrit un tableau RCFT ; rows[i] = indices des colonnes cochées pour objects[i]"""
+    f.write("| | " + " | ".join(columns) + " |\n")
+    for obj, indices in zip(objects, rows):
+        if sparse:
+            f.write(f"| {obj} | {' '.join(columns[j] for j in indices)} |\n")
+            continue
+        cells = [""] * len(columns)
+        for j in indices:
+            cells[j] = "x"
+        f.write(f"| {obj} | " + " | ".join(cells) + " |\n")
+    f.write("\n")
+
+
+def generate_rcft(f, contexts=2, objects=100, attributes=20, density=0.1,
+                  relations=1, fanout=3, sparse=False, seed=0):
+    """
+    Écrit un RCFT synthétique dans le fichier texte f (écriture en flux, ligne par ligne).
+    - contexts / objects / attributes : nombre de contextes, d'objets et d'attributs par contexte
+    - density : probabilité qu'une case objet × attribut soit cochée
+    - relations / fanout : nombre de relations et nombre de cibles par objet source
+    - sparse : relations écrites dans le dialecte creux ('format sparse')
+    """
+    rng = random.Random(seed)
+    names = [f"C{k}" for k in range(contexts)]
+    object_names = {c: [f"{c}_o{i}" for i in range(objects)] for c in names}
+
+    for c in names:
+        f.write(f"FormalContext {c}\n")
+        props = [f"{c}_a{j}" for j in range(attributes)]
+        rows = [[j for j in range(attributes) if rng.random() < density] for _ in range(objects)]
+        _write_table(f, object_names[c], props, rows, sparse=False)
+
+    for r in range(relations):
+        source = names[r % contexts]
+        target = names[(r + 1) % contexts]
+        f.write(f"RelationalContext R{r}\n")
+        f.write(f"source {source}\n")
+        f.write(f"target {target}\n")
+        f.write("scaling exist\n")
+        if sparse:
+            f.write("format sparse\n")
+        k = min(fanout, objects)
+        rows = [sorted(rng.sample(range(objects), k)) for _ in range(objects)]
+        _write_table(f, object_names[source], object_names[target], rows, sparse)
+
+
+def write_rcft(path, **params):
+    """generate_rcft vers un fichier ; retourne le chemin"""
+    with open(path, 'w', encoding='utf-8') as f:
+        generate_rcft(f, **params)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un fichier RCFT synthétique.")
+    parser.add_argument("output")
+    parser.add_argument("--contexts", type=int, default=2)
+    parser.add_argument("--objects", type=int, default=100)
+    parser.add_argument("--attributes", type=int, default=20)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--relations", type=int, default=1)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--sparse", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    params = dict(vars(args))
+    write_rcft(params.pop("output"), **params)
+    print(f"[GEN] {args.output} écrit ({args.contexts} contextes × {args.objects} objets, {args.relations} relation(s)).")
+
+
+if __name__ == "__main__":
+    main()
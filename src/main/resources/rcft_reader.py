@@ -0,0 +1,214 @@
+"""
+Lecteur RCFT en flux, partagé par load_rcft.py et pipeline_rca.py.
+
+Le fichier est lu ligne par ligne (une seule passe, sans readlines()) et découpé
+en événements ; chaque ligne de tableau est convertie tout de suite en bitset.
+Mémoire intermédiaire : les bitsets du bloc en cours, jamais le texte du fichier.
+
+Dialecte creux : un bloc contenant la ligne 'format sparse' liste, pour chaque objet,
+uniquement les colonnes cochées (séparées par des espaces) au lieu d'une case par colonne :
+    RelationalContext dependencies
+    source Classes
+    target Types
+    scaling exist
+    format sparse
+    | | EString | EDouble | EBoolean |
+    | Laptop | EString EDouble |
+Les relations creuses sont chargées en CSR (SparseRelation), en O(nnz).
+"""
+from bit_context import BitContext, SparseRelation, bits_from_indices, columns_from_rows
+from metrics import get_metrics
+from rca_engine import RCAManager
+
+KEYWORDS = ("FormalContext", "RelationalContext")
+META_KEYS = ("source", "target", "scaling", "format")
+
+
+def _parse_header(line):
+    """Noms des colonnes d'une ligne d'en-tête '| | col1 | col2 |'"""
+    parts = [p.strip() for p in line.split('|')]
+    # parts[0] est vide (avant le 1er pipe), parts[1] est le coin haut-gauche
+    return [c for c in parts[2:] if c]
+
+
+def _parse_row(line, width):
+    """Nom de l'objet et bitset (bit j = colonne j cochée 'x') d'une ligne de tableau"""
+    parts = line.split('|')
+    if len(parts) < 2:
+        return None, 0
+    obj_name = parts[1].strip()
+    if not obj_name:
+        return None, 0 # Ligne séparatrice
+    values = parts[2:2 + width]
+    return obj_name, bits_from_indices((j for j, v in enumerate(values) if v.strip().lower() == 'x'), width)
+
+
+def _parse_sparse_row(line, index):
+    """Nom de l'objet et indices des colonnes listées d'une ligne creuse '| obj | col1 col2 |'"""
+    parts = line.split('|')
+    if len(parts) < 2:
+        return None, [], []
+    obj_name = parts[1].strip()
+    if not obj_name:
+        return None, [], []
+    names = parts[2].split() if len(parts) > 2 else []
+    known = [index[n] for n in names if n in index]
+    unknown = [n for n in names if n not in index]
+    return obj_name, known, unknown
+
+
+def iter_rcft(lines):
+    """
+    Tokenise un RCFT (fichier ouvert ou tout itérable de lignes) en événements :
+    - ('context', nom)           début d'un FormalContext
+    - ('relation', nom)          début d'un RelationalContext
+    - ('meta', clé, valeur)      source / target / scaling d'une relation
+    - ('header', colonnes)       en-tête du tableau
+    - ('row', objet, bitset)     ligne du tableau
+    - ('sparse_row', objet, [j]) ligne du tableau en dialecte creux (indices des colonnes)
+    - ('end',)                   fin du bloc courant
+    """
+    in_block = False
+    width = None # None tant que l'en-tête du bloc n'a pas été lu
+    sparse = False
+    index = None # Nom de colonne -> indice (dialecte creux)
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped: continue
+
+        if stripped.startswith(KEYWORDS):
+            if in_block:
+                yield ('end',)
+            kind, _, name = stripped.partition(" ")
+            yield ('context' if kind == "FormalContext" else 'relation', name.split(" ")[0].strip())
+            in_block = True
+            width = None
+            sparse = False
+            continue
+
+        if stripped.startswith('|'):
+            if width is None:
+                columns = _parse_header(line)
+                width = len(columns)
+                if sparse:
+                    index = {name: j for j, name in enumerate(columns)}
+                yield ('header', columns)
+            elif sparse:
+                obj_name, indices, unknown = _parse_sparse_row(line, index)
+                if unknown:
+                    print(f" [WARN] Colonnes inconnues ignorées pour '{obj_name}' : {', '.join(unknown)}")
+                if obj_name:
+                    yield ('sparse_row', obj_name, indices)
+            else:
+                obj_name, bits = _parse_row(line, width)
+                if obj_name:
+                    yield ('row', obj_name, bits)
+            continue
+
+        key, _, value = stripped.partition(" ")
+        if key in META_KEYS:
+            if key == "format":
+                sparse = value.strip() == "sparse"
+            yield ('meta', key, value.strip())
+
+    if in_block:
+        yield ('end',)
+
+
+def parse_grid(lines):
+    """
+    Transforme les lignes de texte d'une table ASCII type RCFT en objets/colonnes/matrice.
+    Format attendu :
+    | | col1 | col2 |
+    | obj1 | x | |
+    | obj2 | | x |
+    """
+    col_names = None
+    row_names = []
+    matrix = []
+    for event in iter_rcft(lines):
+        if event[0] == 'header':
+            col_names = event[1]
+        elif event[0] == 'row':
+            row_names.append(event[1])
+            matrix.append([bool(event[2] >> j & 1) for j in range(len(col_names))])
+        elif event[0] == 'sparse_row':
+            row_names.append(event[1])
+            present = set(event[2])
+            matrix.append([j in present for j in range(len(col_names))])
+    if col_names is None:
+        return None, None, None
+    return row_names, col_names, matrix
+
+
+def load_data_from_rcft(filepath, manager=None):
+    """
+    Lit un fichier RCFT complet et peuple un RCAManager (créé si non fourni).
+    Les contextes sont construits directement en BitContext, les relations en colonnes bitsets.
+    """
+    print(f"--- Lecture du fichier {filepath} ---")
+    rca = manager if manager is not None else RCAManager()
+
+    try:
+        with get_metrics().phase('parse'), open(filepath, 'r', encoding='utf-8') as f:
+            _fill_manager(rca, iter_rcft(f))
+    except FileNotFoundError:
+        print(f"[ERREUR] Fichier {filepath} introuvable.")
+        return None
+
+    return rca
+
+
+def _fill_manager(rca, events):
+    """Consomme les événements du lecteur et alimente le RCAManager bloc par bloc"""
+    block = None
+
+    for event in events:
+        kind = event[0]
+        if kind in ('context', 'relation'):
+            block = {'kind': kind, 'name': event[1], 'meta': {}, 'columns': None, 'objects': [], 'rows': []}
+        elif block is None:
+            continue
+        elif kind == 'meta':
+            block['meta'][event[1]] = event[2]
+        elif kind == 'header':
+            block['columns'] = event[1]
+        elif kind in ('row', 'sparse_row'):
+            # En dialecte creux, 'rows' contient des listes d'indices au lieu de bitsets
+            block['objects'].append(event[1])
+            block['rows'].append(event[2])
+        elif kind == 'end':
+            _add_block(rca, block)
+            block = None
+
+
+def _add_block(rca, block):
+    name = block['name']
+    rows = block['rows']
+    cols = block['columns']
+    if not rows or not cols:
+        return
+
+    sparse = block['meta'].get('format') == 'sparse'
+
+    # --- CAS 1 : CONTEXTE (FormalContext) ---
+    if block['kind'] == 'context':
+        if sparse:
+            rows = [bits_from_indices(indices, len(cols)) for indices in rows]
+        print(f" [LOAD] Contexte trouvé : '{name}' ({len(rows)} objets, {len(cols)} attributs)")
+        rca.add_bit_context(name, BitContext.from_rows(block['objects'], cols, rows))
+        return
+
+    # --- CAS 2 : RELATION (RelationalContext) ---
+    source_name = block['meta'].get('source')
+    target_name = block['meta'].get('target')
+    if not source_name or not target_name:
+        print(f" [WARN] Relation '{name}' ignorée : Source ou Target introuvable.")
+        return
+
+    print(f" [LOAD] Relation trouvée : '{name}' ({source_name} -> {target_name})")
+    if sparse:
+        rca.add_sparse_relation(source_name, target_name, SparseRelation.from_rows(rows, len(cols)), name=name)
+        return
+    rca.add_relation_columns(source_name, target_name, columns_from_rows(rows, len(cols)), name=name, n_sources=len(rows))
@@ -0,0 +1,162 @@
+"""
+Stabilité (intensionnelle) des concepts d'un BitContext.
+
+stabilité(A, B) = |{C ⊆ A : C' = B}| / 2^|A|
+Pour i dans A, soit miss_i les attributs hors de B que i ne possède pas : C' = B
+ssi l'union des miss_i (i ∈ C) couvre tous les attributs hors de B.
+
+- Exact : programmation dynamique sur les unions distinctes (et non sur les 2^|A| sous-ensembles) ;
+  les objets possédant tous les attributs (miss vide) ne comptent que pour un facteur 2.
+- Estimation Monte Carlo au-delà : les tirages sont vectorisés dans des bitsets
+  (bit s = tirage s), un ET/OU de grands entiers traite tous les tirages d'un coup.
+  L'intervalle de confiance est celui de Wilson.
+"""
+import math
+import random
+
+from bit_context import iter_bits, popcount
+
+EXACT_MAX_WORK = 1 << 13  # Mises à jour d'unions max du calcul exact avant de basculer sur l'estimation
+DEFAULT_SAMPLES = 4096
+DEFAULT_CONFIDENCE = 0.95
+CERTAIN_COVER = 48  # Attribut absent chez au moins 48 objets : non couvert avec proba 2^-48, ignoré
+
+
+class StabilityEstimate:
+    """Valeur de stabilité et son intervalle de confiance (low == value == high si exacte)"""
+    __slots__ = ('value', 'low', 'high', 'exact', 'samples')
+
+    def __init__(self, value, low, high, exact, samples=0):
+        self.value = value
+        self.low = low
+        self.high = high
+        self.exact = exact
+        self.samples = samples
+
+    def __float__(self):
+        return self.value
+
+    def __repr__(self):
+        if self.exact:
+            return f"StabilityEstimate({self.value:.4f}, exact)"
+        return f"StabilityEstimate({self.value:.4f}, [{self.low:.4f}, {self.high:.4f}], n={self.samples})"
+
+
+def _z_score(confidence):
+    """Quantile de la loi normale pour un intervalle bilatéral (bissection sur erf)"""
+    lo, hi = 0.0, 10.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if math.erf(mid / math.sqrt(2)) < confidence:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def wilson_interval(successes, trials, confidence=DEFAULT_CONFIDENCE):
+    """Intervalle de confiance de Wilson d'une proportion"""
+    if not trials:
+        return 0.0, 1.0
+    z = _z_score(confidence)
+    p = successes / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def samples_for(epsilon, confidence=DEFAULT_CONFIDENCE):
+    """Nb de tirages garantissant une demi-largeur d'intervalle <= epsilon (pire cas p = 1/2)"""
+    z = _z_score(confidence)
+    return math.ceil(z * z / (4 * epsilon * epsilon))
+
+
+def _outside_and_miss(ctx, extent_bits, intent_bits):
+    outside = ((1 << len(ctx.properties)) - 1) & ~intent_bits
+    rows = ctx.rows
+    return outside, [outside & ~rows[i] for i in iter_bits(extent_bits)]
+
+
+def exact_stability(ctx, extent_bits, intent_bits, max_work=EXACT_MAX_WORK):
+    """
+    Stabilité exacte, ou None si le calcul dépasse max_work mises à jour
+    (Σ du nombre d'unions distinctes à chaque objet ajouté)
+    """
+    outside, miss = _outside_and_miss(ctx, extent_bits, intent_bits)
+    if not outside:
+        return 1.0
+    free = sum(1 for m in miss if not m)  # Objets sans effet sur l'union : facteur 2 chacun
+    states = {0: 1}
+    work = 0
+    for m in miss:
+        if not m: continue
+        work += len(states)
+        if work > max_work:
+            return None
+        new_states = dict(states)
+        for union, count in states.items():
+            u = union | m
+            new_states[u] = new_states.get(u, 0) + count
+        states = new_states
+    return states.get(outside, 0) * (1 << free) / (1 << len(miss))
+
+
+def sampled_stability(ctx, extent_bits, intent_bits, samples=DEFAULT_SAMPLES,
+                      confidence=DEFAULT_CONFIDENCE, rng=None):
+    """
+    Estimation Monte Carlo. Chaque objet de A reçoit un bitset aléatoire de `samples` bits
+    (bit s : l'objet est dans le sous-ensemble tiré n°s). Un attribut m hors de B est couvert
+    dans les tirages où au moins un objet de A sans m est présent ; un tirage réussit si
+    tous les attributs hors de B sont couverts.
+    """
+    rng = rng or random.Random(0)
+    outside = ((1 << len(ctx.properties)) - 1) & ~intent_bits
+    if not outside:
+        return StabilityEstimate(1.0, 1.0, 1.0, True)
+
+    draws = {}  # Tirés à la demande : seuls les objets qui peuvent faire échouer un tirage comptent
+    success = (1 << samples) - 1
+    for j in iter_bits(outside):
+        lacking = extent_bits & ~ctx.columns[j]
+        if popcount(lacking) >= CERTAIN_COVER: continue
+        covered = 0
+        for i in iter_bits(lacking):
+            draw = draws.get(i)
+            if draw is None:
+                draw = draws[i] = rng.getrandbits(samples)
+            covered |= draw
+        success &= covered
+        if not success: break
+
+    hits = popcount(success)
+    low, high = wilson_interval(hits, samples, confidence)
+    return StabilityEstimate(hits / samples, low, high, False, samples)
+
+
+def stability(ctx, extent_bits, intent_bits, samples=DEFAULT_SAMPLES,
+              confidence=DEFAULT_CONFIDENCE, rng=None, max_work=EXACT_MAX_WORK):
+    """Stabilité exacte si elle est abordable, estimation avec intervalle de confiance sinon"""
+    value = exact_stability(ctx, extent_bits, intent_bits, max_work)
+    if value is not None:
+        return StabilityEstimate(value, value, value, True)
+    return sampled_stability(ctx, extent_bits, intent_bits, samples, confidence, rng)
+
+
+def lattice_stability(ctx, concepts, samples=DEFAULT_SAMPLES, confidence=DEFAULT_CONFIDENCE,
+                      seed=0, max_work=EXACT_MAX_WORK):
+    """
+    Stabilité de chaque concept d'un treillis de ctx (tel que retourné par RCAManager.run()).
+    Accepte les concepts en bitsets (extent_bits / intent_bits) comme ceux de la lib concepts (noms).
+    Résultats dans l'ordre des concepts ; tirages reproductibles (seed).
+    """
+    rng = random.Random(seed)
+    result = []
+    for concept in concepts:
+        extent_bits = getattr(concept, 'extent_bits', None)
+        intent_bits = getattr(concept, 'intent_bits', None)
+        if extent_bits is None or intent_bits is None:
+            extent_bits = ctx.object_bits(concept.extent)
+            intent_bits = ctx.property_bits(concept.intent)
+        result.append(stability(ctx, extent_bits, intent_bits, samples, confidence, rng, max_work))
+    return result
@@ -1,5 +1,6 @@
-from concepts import Context
 import copy
+from bit_context import BitContext
+from incremental_lattice import IncrementalLattice
 
 class RCAManager:
     def __init__(self):
@@ -13,8 +14,11 @@ class RCAManager:
             'objects': objects,
             'properties': properties,
             'matrix': matrix,
-            'base_width': len(properties) # Pour se souvenir des props originales
+            'base_width': len(properties), # Pour se souvenir des props originales
+            'bits': BitContext.from_matrix(objects, properties, matrix)
         }
+        # Treillis maintenu incrémentalement (mis à jour à chaque colonne ajoutée)
+        self.lattices[name] = IncrementalLattice(self.contexts[name]['bits'])
 
     def add_relation(self, source_ctx, target_ctx, relation_matrix):
         """
@@ -28,9 +32,10 @@ class RCAManager:
         })
 
     def get_concept_lattice(self, ctx_name):
-        """Génère le treillis pour un contexte donné via la lib concepts"""
-        data = self.contexts[ctx_name]
-        return Context(data['objects'], data['properties'], data['matrix']).lattice
+        """Retourne le treillis courant d'un contexte (mise à jour incrémentale)"""
+        lattice = self.lattices[ctx_name]
+        lattice.update()
+        return lattice.concepts()
 
     def _existential_scaling(self):
         """
@@ -90,6 +95,7 @@ class RCAManager:
                     source_data['properties'].append(new_attr)
                     for idx, val in enumerate(new_col):
                         source_data['matrix'][idx].append(val)
+                    source_data['bits'].add_column(new_attr, sum(1 << idx for idx, val in enumerate(new_col) if val))
                     changes += 1
                     print(f"   [+] Ajout attribut relationnel dans '{source_name}' : {new_attr}")
 